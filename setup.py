@@ -67,6 +67,7 @@ setup(
         'docs': ['pydoc-markdown'],
         'flask': ['flask'],
         'tornado': ['tornado'],
+        'aiohttp': ['aiohttp'],
         'yaml': ['pyyaml'],
     },
     classifiers=[
@@ -9,6 +9,14 @@ from sqlalchemy.types import String
 log = logging.getLogger('unrest.coercers')
 
 
+def _enforce_iterable(it):
+    """Returns an iterable on `it`, wrapping it in a tuple if needed."""
+    try:
+        return iter(it)
+    except TypeError:
+        return (it,)
+
+
 class Property(object):
     """
     A Property wrapper used instead of a string in a #::unrest.rest#Rest
@@ -71,16 +79,71 @@ class Serialize(object):
         self.columns = columns
         self.properties = properties
         self.relationships = relationships
+        self._coercers = {}
 
-    def dict(self):
-        """Serialize the given model to a JSON compatible dict"""
+    @classmethod
+    def compile(cls, columns, properties, relationships):
+        """
+        Returns a function that serializes an item to a JSON compatible dict.
 
-        def enforce_iterable(it):
-            try:
-                return iter(it)
-            except TypeError:
-                return (it,)
+        The coercer of each column is resolved once here instead of for each
+        value. If this class overrides `dict`, `serialize`, `_serialize` or
+        any `serialize_<type>` method (which can read `self.model`), the
+        returned function instantiates it for each item instead.
 
+        # Arguments
+            columns: The mapping of columns to serialize.
+            properties: The list of properties to serialize.
+            relationships: The mapping of relationships to serialize.
+        """
+        if (
+            cls.dict is not Serialize.dict
+            or cls.serialize is not Serialize.serialize
+            or cls._serialize is not Serialize._serialize
+            or any(
+                name.startswith('serialize_')
+                and getattr(cls, name) is not getattr(Serialize, name, None)
+                for name in dir(cls)
+            )
+        ):
+
+            def serialize(model):
+                return cls(model, columns, properties, relationships).dict()
+
+            return serialize
+
+        serializer = cls(None, columns, properties, relationships)
+        fields = tuple(
+            (name, column.type, serializer.coercer(column.type))
+            for name, column in columns.items()
+        )
+        properties = tuple(properties)
+        relationships = tuple(
+            (key, relationship_rest.serialize)
+            for key, relationship_rest in relationships.items()
+        )
+
+        def serialize(model):
+            rv = {}
+            for name, type, coercer in fields:
+                data = getattr(model, name)
+                if data is not None and coercer is not None:
+                    data = coercer(type, data)
+                rv[name] = data
+            for property in properties:
+                rv[property.name] = property.get(serializer, model)
+            for key, serialize_relationship in relationships:
+                rv[key] = [
+                    serialize_relationship(item)
+                    for item in _enforce_iterable(getattr(model, key))
+                    if item is not None
+                ]
+            return rv
+
+        return serialize
+
+    def dict(self):
+        """Serialize the given model to a JSON compatible dict"""
         return dict(
             {
                 name: self.serialize(name, column)
@@ -94,7 +157,7 @@ class Serialize(object):
                 **{
                     key: [
                         relationship_rest.serialize(item)
-                        for item in enforce_iterable(getattr(self.model, key))
+                        for item in _enforce_iterable(getattr(self.model, key))
                         if item is not None
                     ]
                     for key, relationship_rest in self.relationships.items()
@@ -105,17 +168,29 @@ class Serialize(object):
     def serialize(self, name, column):
         return self._serialize(column.type, getattr(self.model, name))
 
+    def coercer(self, type):
+        """
+        Returns the `serialize_<type>` method for the sqlalchemy `type`
+        or None if there is none. The lookup is cached by type class.
+        """
+        type_class = type.__class__
+        if type_class not in self._coercers:
+            method_name = f'serialize_{type_class.__name__.lower()}'
+            coercer = getattr(self, method_name, None)
+            if coercer is None:
+                log.debug(
+                    f'Missing method for type serialization {method_name}'
+                )
+            self._coercers[type_class] = coercer
+        return self._coercers[type_class]
+
     def _serialize(self, type, data):
         if data is None:
             return
-        method_name = f'serialize_{type.__class__.__name__.lower()}'
-
-        if hasattr(self, method_name):
-            return getattr(self, method_name)(type, data)
-
-        log.debug(f'Missing method for type serialization {method_name}')
-
-        return data
+        coercer = self.coercer(type)
+        if coercer is None:
+            return data
+        return coercer(type, data)
 
     def serialize_array(self, type, data):
         return [self._serialize(type.item_type, datum) for datum in data]
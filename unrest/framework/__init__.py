@@ -1,3 +1,8 @@
+from asyncio import get_running_loop
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+
+
 class Framework(object):
     """
     UnRest Framework abstract class.
@@ -37,6 +42,24 @@ class Framework(object):
             'You have to implement the register route method'
         )
 
+    @staticmethod
+    def is_async(function):
+        """
+        Returns True if the route `function` returns a coroutine to await:
+        when its rest endpoint runs on an `AsyncSession`.
+        """
+        rest = getattr(function, 'rest', None)
+        return bool(rest and rest.unrest.is_async)
+
+    @staticmethod
+    def shares_session(function):
+        """
+        Returns True if the route `function` uses the same session for all
+        the requests, which must then never run concurrently.
+        """
+        rest = getattr(function, 'rest', None)
+        return bool(rest and not rest.unrest.has_thread_sessions)
+
     @property
     def external_url(self):
         """
@@ -51,3 +74,59 @@ class Framework(object):
         that you can use in your implementation.
         """
         return f"unrest__{self.url.lstrip('/').replace('/', '_')}__{name}"
+
+
+class AsyncFramework(Framework):
+    """
+    UnRest #::unrest.framework#Framework abstract class for asynchronous
+    frameworks.
+
+    Asynchronous frameworks must await the routes through #call: routes
+    on an `AsyncSession` are coroutines awaited natively, synchronous ones
+    query the database in #run_in_executor so the event loop is never
+    blocked. Routes sharing one session (neither a `scoped_session` nor a
+    `session_factory`) are run one at a time in a single thread.
+
+    # Arguments
+        app: Your framework instance used in `register_route` to register
+            route.
+        url: The current UnRest url ('/api' by default)
+        executor: The `concurrent.futures.Executor` running the routes,
+            defaults to a `ThreadPoolExecutor` of `__max_workers__` threads
+            (`functools.partial` the framework class to give it).
+    """
+
+    __max_workers__ = None
+
+    def __init__(self, app, url, executor=None):
+        super().__init__(app, url)
+        self.executor = executor or ThreadPoolExecutor(
+            max_workers=self.__max_workers__, thread_name_prefix='unrest'
+        )
+        self.serial_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix='unrest_serial'
+        )
+
+    async def call(self, function, request):
+        """
+        Awaits the route `function` for `request`: natively if it's
+        asynchronous, in the executor otherwise (the serial one if it
+        shares its session).
+        """
+        if self.is_async(function):
+            return await function(request)
+        if self.shares_session(function):
+            return await self.run_in_executor(
+                function, request, executor=self.serial_executor
+            )
+        return await self.run_in_executor(function, request)
+
+    async def run_in_executor(self, function, *args, executor=None):
+        """
+        Runs `function` with `args` in the `executor` (#executor by
+        default) within a copy of the current context and returns its
+        result.
+        """
+        return await get_running_loop().run_in_executor(
+            executor or self.executor, copy_context().run, function, *args
+        )
@@ -0,0 +1,66 @@
+import logging
+from functools import wraps
+
+from aiohttp import web
+
+from ..util import Request
+from . import AsyncFramework
+
+log = logging.getLogger(__name__)
+
+
+class AiohttpFramework(AsyncFramework):
+    """
+    Unrest #::unrest.framework#AsyncFramework implementation for aiohttp.
+    Routes are awaited natively on an `AsyncSession` and run in the
+    framework executor otherwise.
+
+    Requires [aiohttp](https://docs.aiohttp.org/) to be installed.
+    """
+
+    def __init__(self, app, url, executor=None):
+        super().__init__(app, url, executor)
+        self.resources = {}
+
+    def resource(self, path):
+        """
+        Returns the aiohttp resource of `path`, shared by all its methods.
+        """
+        if path not in self.resources:
+            self.resources[path] = self.app.router.add_resource(path)
+        return self.resources[path]
+
+    def register_route(self, path, method, parameters, function):
+        name = self._name(function.__name__)
+
+        @wraps(function)
+        async def unrest_fun(request):
+            req = Request(
+                str(request.url),
+                request.method,
+                dict(request.match_info),
+                {key: request.query.getall(key) for key in request.query},
+                await request.read(),
+                request.headers,
+            )
+
+            res = await self.call(function, req)
+
+            return web.Response(
+                body=res.payload.encode('utf-8'),
+                status=res.status,
+                headers={
+                    name: str(value) for name, value in res.headers.items()
+                },
+            )
+
+        self.resource(path).add_route(method, unrest_fun)
+        if parameters:
+            params = '/'.join(f'{{{param}}}' for param in parameters)
+            path_with_params = f'{path}/{params}'
+            log.info(
+                f'Registering route {name} for {path_with_params} for {method}'
+            )
+            self.resource(path_with_params).add_route(method, unrest_fun)
+        else:
+            log.info(f'Registering route {name} for {path} for {method}')
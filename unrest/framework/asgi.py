@@ -0,0 +1,136 @@
+import logging
+from email.message import Message
+from urllib.parse import parse_qs
+
+from ..util import Request
+from . import AsyncFramework
+from .router import Router
+
+log = logging.getLogger(__name__)
+
+
+class AsgiFramework(AsyncFramework):
+    """
+    Unrest #::unrest.framework#AsyncFramework implementation as an
+    [ASGI 3](https://asgi.readthedocs.io/) application.
+
+    The framework instance is itself the ASGI application to serve:
+    requests matching unrest routes are handled by them, everything else
+    (other paths, lifespan and websocket events) is passed to `app`.
+
+    ```python
+    rest = UnRest(other_asgi_app, session, framework=AsgiFramework)
+    rest(Tree)
+    application = rest.framework  # uvicorn module:application
+    ```
+
+    This implementation requires no external library.
+
+    # Arguments
+        app: The ASGI application handling the requests unrest doesn't.
+        url: The current UnRest url ('/api' by default)
+        executor: The `concurrent.futures.Executor` running the routes,
+            see #::unrest.framework#AsyncFramework.
+    """
+
+    __chunk_size__ = 64 * 1024
+
+    def __init__(self, app, url, executor=None):
+        super().__init__(app, url, executor)
+        self.router = Router()
+
+    def register_route(self, path, method, parameters, function):
+        name = self._name(function.__name__.replace(method + '_', ''))
+        self.router.add(path, method, function, parameters)
+        log.info(f'Registering route {name} for {path} for {method}')
+
+    async def __call__(self, scope, receive, send):
+        match = scope['type'] == 'http' and self.router.match(scope['path'])
+        if not match:
+            return await self.app(scope, receive, send)
+
+        methods, url_parameters = match
+        method = scope['method']
+        if method not in methods:
+            return await self.respond(
+                send,
+                405,
+                'Method Not Allowed',
+                {'Allow': ', '.join(methods), 'Content-Type': 'text/plain'},
+            )
+
+        body = await self.read_body(receive)
+        if body is None:
+            # The client disconnected before sending its whole request
+            return
+
+        headers = Message()
+        for name, value in scope['headers']:
+            headers[name.decode('latin-1')] = value.decode('latin-1')
+        request = Request(
+            scope['path'],
+            method,
+            url_parameters,
+            parse_qs(scope['query_string'].decode('latin-1')),
+            body,
+            headers,
+        )
+        try:
+            response = await self.call(methods[method], request)
+        except Exception:
+            log.exception(f'Error on {method} {scope["path"]}')
+            return await self.respond(
+                send,
+                500,
+                'Internal Server Error',
+                {'Content-Type': 'text/plain'},
+            )
+
+        await self.respond(
+            send, response.status, response.payload, response.headers
+        )
+
+    async def read_body(self, receive):
+        """
+        Reads the request body from the `http.request` messages as they
+        come.
+
+        # Returns
+        The body as bytes, or `None` if the client disconnected.
+        """
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    async def respond(self, send, status, payload, headers=None):
+        """
+        Sends the response `payload` in `http.response.body` chunks of
+        `__chunk_size__` bytes.
+        """
+        body = payload.encode('utf-8')
+        raw_headers = [
+            (name.lower().encode('latin-1'), str(value).encode('latin-1'))
+            for name, value in (headers or {}).items()
+        ]
+        raw_headers.append((b'content-length', str(len(body)).encode()))
+        await send(
+            {
+                'type': 'http.response.start',
+                'status': status,
+                'headers': raw_headers,
+            }
+        )
+        for start in range(0, len(body) or 1, self.__chunk_size__):
+            end = start + self.__chunk_size__
+            await send(
+                {
+                    'type': 'http.response.body',
+                    'body': body[start:end],
+                    'more_body': end < len(body),
+                }
+            )
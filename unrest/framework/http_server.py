@@ -1,14 +1,73 @@
 import logging
-import re
-from types import MethodType
+from concurrent.futures import ThreadPoolExecutor
+from http.server import ThreadingHTTPServer
 from urllib.parse import parse_qs, urlparse
 
 from ..util import Request
 from . import Framework
+from .router import Router
 
 log = logging.getLogger(__name__)
 
 
+class ThreadPoolHTTPServer(ThreadingHTTPServer):
+    """
+    A `ThreadingHTTPServer` handling its connections in a bounded pool of
+    threads instead of a new thread per connection, and keeping them
+    alive with HTTP/1.1 on unrest routes.
+
+    Connections exceeding the pool size wait for a free thread, an idle
+    kept alive connection is closed after `keep_alive_timeout` seconds to
+    release its thread. The app handler must send a `Content-Length` on
+    its own routes to keep connections alive.
+
+    As the threads are reused, the UnRest session should be a
+    `scoped_session` with `close_session=True` or a `session_factory`.
+
+    ```python
+    server = ThreadPoolHTTPServer(('', 8000), AppHandler, max_workers=16)
+    rest = UnRest(server, session, close_session=True,
+                  framework=HTTPServerFramework)
+    rest(Tree)
+    server.serve_forever()
+    ```
+
+    # Arguments
+        server_address: The `(host, port)` to listen on.
+        RequestHandlerClass: The app request handler class.
+        max_workers: The maximum number of connections served at once,
+            defaults to the `ThreadPoolExecutor` default.
+        keep_alive_timeout: The seconds an idle connection is kept open.
+    """
+
+    protocol_version = 'HTTP/1.1'
+
+    def __init__(
+        self,
+        server_address,
+        RequestHandlerClass,
+        max_workers=None,
+        keep_alive_timeout=5,
+        bind_and_activate=True,
+    ):
+        super().__init__(
+            server_address, RequestHandlerClass, bind_and_activate
+        )
+        self.keep_alive_timeout = keep_alive_timeout
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix='unrest'
+        )
+
+    def process_request(self, request, client_address):
+        self.executor.submit(
+            self.process_request_thread, request, client_address
+        )
+
+    def server_close(self):
+        super().server_close()
+        self.executor.shutdown()
+
+
 class HTTPServerFramework(Framework):
     """
     Unrest #::unrest.framework#Framework implementation for
@@ -16,63 +75,67 @@ class HTTPServerFramework(Framework):
     compatible app.
 
     This exemple implementation requires no external library.
+    Serve it with #ThreadPoolHTTPServer to handle concurrent requests on
+    persistent connections.
     """
 
+    # Methods answered with a 405 on unrest paths even if no rest uses them
+    __methods__ = ('GET', 'HEAD', 'POST', 'PUT', 'DELETE', 'PATCH', 'OPTIONS')
+
     def __init__(self, app, url):
         super().__init__(app, url)
-        self.url_map = {}
+        self.router = Router()
         parent = self
+        Handler = self.app.RequestHandlerClass
 
-        class HTTPServerFrameworkHandlerClass(self.app.RequestHandlerClass):
+        class HTTPServerFrameworkHandlerClass(Handler):
             """
             http.server.RequestHandlerClass implementation for UnRest
             #Framework
             """
 
-            def __getattribute__(self, name):
-                if name.startswith('do_'):
-                    method = name.replace('do_', '')
-
-                    def do_METHOD(self):
-                        # Handle only requests starting with url
-                        if not self.path.startswith(parent.url):
-                            return getattr(super(), name)()
-                        return self.handle_request(method)
-
-                    return MethodType(do_METHOD, self)
-                return super().__getattribute__(name)
+            # Speak HTTP/1.1 if the server supports it
+            protocol_version = getattr(
+                parent.app, 'protocol_version', Handler.protocol_version
+            )
+            timeout = getattr(
+                parent.app, 'keep_alive_timeout', Handler.timeout
+            )
 
             def handle_request(self, method):
                 url = urlparse(self.path)
-                # Look up in the url_map if we have matching endpoint
-                for path, methods in parent.url_map.items():
-                    match = re.fullmatch(path, url.path)
-                    if match:
-                        # With a corresponding method
-                        if method not in methods:
-                            return self.send(405, 'Method Not Allowed')
-                        return self.respond(
-                            url, method, methods[method], match.groupdict()
-                        )
-                return self.send(404, 'Not Found')
+                # Always consume the body to keep the connection usable
+                length = int(self.headers.get('Content-Length') or 0)
+                body = self.rfile.read(length) if length else b''
+                match = parent.router.match(url.path)
+                if not match:
+                    return self.send(404, 'Not Found')
+                methods, url_parameters = match
+                # With a corresponding method
+                if method not in methods:
+                    return self.send(
+                        405,
+                        'Method Not Allowed',
+                        {'Allow': ', '.join(methods)},
+                    )
+                return self.respond(
+                    url, method, methods[method], url_parameters, body
+                )
 
             def send(self, status, message, headers=None):
                 headers = headers or {}
+                body = message.encode('utf-8')
                 self.send_response(status)
 
                 for name, value in headers.items():
                     self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
                 self.end_headers()
 
-                self.wfile.write(message.encode('utf-8'))
+                if self.command != 'HEAD':
+                    self.wfile.write(body)
 
-            def respond(self, url, method, function, url_parameters):
-                length = (
-                    int(self.headers['Content-Length'])
-                    if 'Content-Length' in self.headers
-                    else 0
-                )
-                body = self.rfile.read(length) if length else ''
+            def respond(self, url, method, function, url_parameters, body):
                 request = Request(
                     url.path,
                     method,
@@ -89,29 +152,39 @@ class HTTPServerFramework(Framework):
 
                 self.send(response.status, response.payload, response.headers)
 
+        self.HandlerClass = HTTPServerFrameworkHandlerClass
         self.app.RequestHandlerClass = HTTPServerFrameworkHandlerClass
+        for method in self.__methods__:
+            self.add_method(method)
+
+    def add_method(self, method):
+        """
+        Defines the `do_{method}` method of the request handler class,
+        handling the requests under the unrest url and passing the others
+        to the app handler.
+        """
+        name = f'do_{method}'
+        if name in vars(self.HandlerClass):
+            return
+        fallback = getattr(self.HandlerClass, name, None)
+        url = self.url
+
+        def do_METHOD(self):
+            # Handle only requests starting with url
+            if not self.path.startswith(url):
+                if fallback is None:
+                    return self.send_error(
+                        501, f'Unsupported method ({method!r})'
+                    )
+                return fallback(self)
+            return self.handle_request(method)
+
+        do_METHOD.__name__ = name
+        setattr(self.HandlerClass, name, do_METHOD)
 
     def register_route(self, path, method, parameters, function):
         name = self._name(function.__name__.replace(method + '_', ''))
-        # Creating an url regex that accept parameters
-        if parameters:
-            params = '/'.join(f'(?P<{param}>.+)' for param in parameters)
-            path_with_params = f'{path}(?:/{params})?'
-        else:
-            path_with_params = path
-
-        # If this is the first method for path, initialize method mapping
-        if path_with_params not in self.url_map:
-            self.url_map[path_with_params] = {}
-
-        if method in self.url_map[path_with_params]:
-            raise KeyError(
-                f'Method {method} is already registered for path {path}'
-            )
-
-        log.info(
-            f'Registering route {name} for {path_with_params} for {method}'
-        )
-
         # Associate UnRest function with path and method
-        self.url_map[path_with_params][method] = function
+        self.router.add(path, method, function, parameters)
+        self.add_method(method)
+        log.info(f'Registering route {name} for {path} for {method}')
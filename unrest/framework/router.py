@@ -0,0 +1,63 @@
+class Router(object):
+    """
+    A dependency free router for the unrest routes, used by the frameworks
+    that don't come with their own.
+
+    Unrest routes are a static path optionally followed by one url segment
+    per primary key. Static paths are looked up in a dict, and a path with
+    parameters is split on its last segments and looked up in a dict of
+    the paths having that many parameters: matching a request costs a few
+    dict lookups whatever the number of routes.
+    """
+
+    def __init__(self):
+        self.routes = {}
+        self.parametrized = {}
+
+    def add(self, path, method, function, parameters=None):
+        """
+        Registers `function` for the `method` requests on `path`, and
+        on `path` followed by the `parameters` if any.
+
+        # Arguments
+            path: The url of the endpoint without parameters.
+            method: The HTTP method of the route.
+            function: The route function.
+            parameters: The names of the url parameters.
+
+        # Raises
+            KeyError: If `method` is already registered for `path`.
+        """
+        methods = self.routes.setdefault(path, {})
+        if method in methods:
+            raise KeyError(
+                f'Method {method} is already registered for path {path}'
+            )
+        methods[method] = function
+
+        if parameters:
+            parameters = tuple(parameters)
+            paths = self.parametrized.setdefault(len(parameters), {})
+            _, methods = paths.setdefault(path, (parameters, {}))
+            methods[method] = function
+
+    def match(self, path):
+        """
+        Finds the route of `path`.
+
+        # Arguments
+            path: The request path.
+
+        # Returns
+        A tuple of the `{method: function}` dict of the matching route and
+        the dict of its url parameters, or `None` if no route matches.
+        """
+        methods = self.routes.get(path)
+        if methods is not None:
+            return methods, {}
+
+        for count, paths in self.parametrized.items():
+            parts = path.rsplit('/', count)
+            if len(parts) > count and parts[0] in paths and all(parts[1:]):
+                parameters, methods = paths[parts[0]]
+                return methods, dict(zip(parameters, parts[1:]))
@@ -4,15 +4,16 @@ from functools import wraps
 from sanic import response
 
 from ..util import Request
-from . import Framework
+from . import AsyncFramework
 
 log = logging.getLogger(__name__)
 
 
-class SanicFramework(Framework):
+class SanicFramework(AsyncFramework):
     """
-    Unrest #::unrest.framework#Framework implementation for Sanic.
-    Sadly only synchroneous sqlalchemy query are supported for now.
+    Unrest #::unrest.framework#AsyncFramework implementation for Sanic.
+    Routes on an `AsyncSession` are awaited natively, synchronous ones
+    are run in the framework executor.
 
     Requires [Sanic](https://sanicframework.org/) to be installed.
     """
@@ -21,7 +22,7 @@ class SanicFramework(Framework):
         name = self._name(function.__name__)
 
         @wraps(function)
-        def unrest_fun(request, **url_parameters):
+        async def unrest_fun(request, **url_parameters):
             req = Request(
                 request.url,
                 request.method,
@@ -31,7 +32,7 @@ class SanicFramework(Framework):
                 request.headers,
             )
 
-            res = function(req)
+            res = await self.call(function, req)
 
             return response.raw(
                 res.payload.encode('utf-8'),
@@ -4,22 +4,22 @@ from functools import wraps
 from tornado.web import RequestHandler, _ApplicationRouter
 
 from ..util import Request
-from . import Framework
+from . import AsyncFramework
 
 log = logging.getLogger(__name__)
 
 
-class TornadoFramework(Framework):
+class TornadoFramework(AsyncFramework):
     """
-    Unrest #::unrest.framework#Framework implementation for Tornado.
+    Unrest #::unrest.framework#AsyncFramework implementation for Tornado.
 
     Requires [tornado](https://www.tornadoweb.org/) to be installed.
     """
 
     __RequestHandlerClass__ = RequestHandler
 
-    def __init__(self, app, url):
-        super().__init__(app, url)
+    def __init__(self, app, url, executor=None):
+        super().__init__(app, url, executor)
         self.router = _ApplicationRouter(app)
         self.app.default_router.add_rules([(url + r'(.*)', self.router)])
 
@@ -55,8 +55,10 @@ class TornadoFramework(Framework):
             f'Registering route {name} for {path_with_params} for {method}'
         )
 
+        framework = self
+
         @wraps(function)
-        def tornado_fun(self, **url_parameters):
+        async def tornado_fun(self, **url_parameters):
             request = Request(
                 self.request.path,
                 self.request.method,
@@ -69,7 +71,7 @@ class TornadoFramework(Framework):
                 self.request.headers,
             )
 
-            response = function(request)
+            response = await framework.call(function, request)
             for name, value in response.headers.items():
                 self.set_header(name, value)
             self.set_status(response.status)
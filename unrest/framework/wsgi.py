@@ -0,0 +1,116 @@
+import logging
+from email.message import Message
+from functools import partial
+from http.client import responses
+from io import BytesIO
+from urllib.parse import parse_qs
+
+from ..util import Request
+from . import Framework
+from .router import Router
+
+log = logging.getLogger(__name__)
+
+
+class WsgiFramework(Framework):
+    """
+    Unrest #::unrest.framework#Framework implementation as a
+    [WSGI](https://peps.python.org/pep-3333/) application.
+
+    The framework instance is itself the WSGI application to serve:
+    requests matching unrest routes are handled by them, everything else
+    is passed to `app`.
+
+    ```python
+    rest = UnRest(other_wsgi_app, session, framework=WsgiFramework)
+    rest(Tree)
+    application = rest.framework  # gunicorn module:application
+    ```
+
+    This implementation requires no external library.
+
+    # Arguments
+        app: The WSGI application handling the requests unrest doesn't.
+        url: The current UnRest url ('/api' by default)
+    """
+
+    __chunk_size__ = 64 * 1024
+
+    def __init__(self, app, url):
+        super().__init__(app, url)
+        self.router = Router()
+
+    def register_route(self, path, method, parameters, function):
+        name = self._name(function.__name__.replace(method + '_', ''))
+        self.router.add(path, method, function, parameters)
+        log.info(f'Registering route {name} for {path} for {method}')
+
+    def __call__(self, environ, start_response):
+        # PEP 3333 native strings are latin-1 decoded
+        path = environ.get('PATH_INFO', '').encode('latin-1').decode('utf-8')
+        match = self.router.match(path)
+        if not match:
+            return self.app(environ, start_response)
+
+        methods, url_parameters = match
+        method = environ['REQUEST_METHOD']
+        if method not in methods:
+            return self.respond(
+                start_response,
+                405,
+                'Method Not Allowed',
+                {'Allow': ', '.join(methods), 'Content-Type': 'text/plain'},
+            )
+
+        length = environ.get('CONTENT_LENGTH')
+        body = environ['wsgi.input'].read(int(length)) if length else b''
+        request = Request(
+            path,
+            method,
+            url_parameters,
+            parse_qs(environ.get('QUERY_STRING', '')),
+            body,
+            self.headers(environ),
+        )
+        try:
+            response = methods[method](request)
+        except Exception:
+            log.exception(f'Error on {method} {path}')
+            return self.respond(
+                start_response,
+                500,
+                'Internal Server Error',
+                {'Content-Type': 'text/plain'},
+            )
+
+        return self.respond(
+            start_response, response.status, response.payload, response.headers
+        )
+
+    def headers(self, environ):
+        """Returns the request headers of `environ` as a `Message`."""
+        headers = Message()
+        for key, value in environ.items():
+            if key.startswith('HTTP_'):
+                name = key[5:]
+            elif key in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                name = key
+            else:
+                continue
+            headers[name.replace('_', '-').title()] = value
+        return headers
+
+    def respond(self, start_response, status, payload, headers=None):
+        """
+        Starts the response and returns its `payload` as an iterable of
+        `__chunk_size__` bytes chunks.
+        """
+        body = payload.encode('utf-8')
+        raw_headers = [
+            (name, str(value)) for name, value in (headers or {}).items()
+        ]
+        raw_headers.append(('Content-Length', str(len(body))))
+        start_response(
+            f"{status} {responses.get(status, 'Unknown')}", raw_headers
+        )
+        return iter(partial(BytesIO(body).read, self.__chunk_size__), b'')
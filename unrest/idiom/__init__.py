@@ -1,3 +1,17 @@
+def split_fields(values):
+    """
+    Returns the list of field names in the comma separated `values`
+    or None if there's none.
+    """
+    fields = [
+        field.strip()
+        for value in values or []
+        for field in value.split(',')
+        if field.strip()
+    ]
+    return fields or None
+
+
 class Idiom(object):
     """
     UnRest Idiom abstract class.
@@ -49,6 +63,47 @@ class Idiom(object):
         """
         raise NotImplementedError()
 
+    def request_fields(self, request):
+        """
+        This method takes the `request` and returns the list of field names
+        the client asked for, or None to get all of them.
+
+        # Arguments
+            request: The original #::unrest.util#Request request
+
+        # Returns
+        The requested field names list or None.
+        """
+        return None
+
+    def request_sort(self, request):
+        """
+        This method takes the `request` and returns the list of
+        `(name, descending)` the client asked to sort on.
+        Used for cursor pagination.
+
+        # Arguments
+            request: The original #::unrest.util#Request request
+
+        # Returns
+        A list of `(name, descending)` tuples.
+        """
+        return []
+
+    def request_cursor(self, request):
+        """
+        This method takes the `request` and returns the `(cursor, limit)`
+        the client asked for. Used for cursor pagination.
+
+        # Arguments
+            request: The original #::unrest.util#Request request
+
+        # Returns
+        The cursor given by the previous page or None, and the page
+        limit or None.
+        """
+        return None, None
+
     def alter_query(self, request, query):
         """
         This method takes the `request` and the current `query` and returns
@@ -6,8 +6,8 @@ from sqlalchemy import asc, desc, func, or_
 from sqlalchemy.sql.expression import cast
 from sqlalchemy.types import String
 
-from ..util import Response
-from . import Idiom
+from ..util import Response, is_sql_expression
+from . import Idiom, split_fields
 
 PK_DELIM = '___'
 
@@ -34,6 +34,10 @@ class JsonServerIdiom(Idiom):
     (`_gte`, `_lte`, `_ne`, `_like`)
     and `q` full-text search (which works better with
     [SQLAlchemy-Searchable](https://sqlalchemy-searchable.readthedocs.io))
+    and `fields` to restrict the returned fields.
+
+    With cursor pagination, the `_cursor` and `_limit` parameters are used
+    and the next page cursor is returned in the `X-Next-Cursor` header.
     """
 
     def request_to_payload(self, request):
@@ -46,6 +50,40 @@ class JsonServerIdiom(Idiom):
                 return {'objects': data}
             return data
 
+    def request_fields(self, request):
+        return split_fields(request.query.get('fields'))
+
+    def request_sort(self, request):
+        sort = request.query.get('_sort', [''])[0]
+        order = request.query.get('_order', [''])[0]
+        return [
+            (name, way.lower() == 'desc')
+            for name, way in zip_longest(
+                sort.split(','), order.split(','), fillvalue='asc'
+            )
+            if name
+        ]
+
+    def request_cursor(self, request):
+        cursor = request.query.get('_cursor', [None])[0]
+        limit = request.query.get('_limit', [None])[0]
+        return cursor, self.request_int(limit, 'limit')
+
+    def request_int(self, value, name, default=None):
+        """
+        Returns the `value` of the `name` query parameter as an int, or
+        `default` if it's empty.
+
+        # Raises
+            RestError: 400 if `value` is not an int.
+        """
+        if not value:
+            return default
+        try:
+            return int(value)
+        except ValueError:
+            self.rest.raise_error(400, f'Invalid {name} {value}')
+
     def data_to_response(self, data, request, status=200):
         if (
             request.method == 'GET'
@@ -59,6 +97,8 @@ class JsonServerIdiom(Idiom):
             objects = data['objects']
             for object in objects:
                 for key, relationship in self.rest.relationships.items():
+                    if key not in object:
+                        continue
                     object[key] = (
                         [
                             PK_DELIM.join(
@@ -74,13 +114,14 @@ class JsonServerIdiom(Idiom):
                         ]
                     )
             # When there's parameter it applies on a unique object
-            # except from POST
+            # except from POST of a single object
             if (
                 request.parameters
                 and all(
                     value is not None for value in request.parameters.values()
                 )
                 or request.method == 'POST'
+                and not (request.payload or b'').lstrip().startswith(b'[')
             ):
                 objects = objects[0]
             payload = json.dumps(objects)
@@ -89,7 +130,16 @@ class JsonServerIdiom(Idiom):
         headers = {'Content-Type': 'application/json'}
         if 'occurences' in data:
             headers['X-Total-Count'] = data['occurences']
+            if data.get('count') == 'capped':
+                headers['X-Total-Count'] = f"{data['occurences']}+"
             headers['Access-Control-Expose-Headers'] = 'X-Total-Count'
+        if 'next' in data:
+            headers['X-Next-Cursor'] = data['next']
+            headers['Access-Control-Expose-Headers'] = ', '.join(
+                header
+                for header in ('X-Total-Count', 'X-Next-Cursor')
+                if header in headers
+            )
         response = Response(payload, headers, status)
         return response
 
@@ -102,6 +152,8 @@ class JsonServerIdiom(Idiom):
                 params[param[1:]] = values[0]
             elif param == 'q':
                 params['q'] = values[0]
+            elif param == 'fields':
+                continue
             else:
                 filters[param] = values
 
@@ -149,15 +201,14 @@ class JsonServerIdiom(Idiom):
 
         # Order
         if params['sort'] and request.method == 'GET':
-            for sort, way in zip_longest(
-                params['sort'].split(','),
-                params['order'].split(','),
-                fillvalue='asc',
-            ):
-                way = desc if way.lower() == 'desc' else asc
+            for sort, descending in self.request_sort(request):
+                way = desc if descending else asc
 
                 if hasattr(Model, sort):
-                    query = query.order_by(way(getattr(Model, sort)))
+                    attribute = getattr(Model, sort)
+                    if not is_sql_expression(attribute):
+                        self.rest.raise_error(400, f'Cannot sort on {sort}')
+                    query = query.order_by(way(attribute))
                 else:
                     query = query.order_by(way(sort.split('.')[-1]))
 
@@ -167,16 +218,17 @@ class JsonServerIdiom(Idiom):
             )
 
         # Offset / Limit
-        offset = int(params['start'] or 0)
+        offset = self.request_int(params['start'], 'start', 0)
 
         if params['page']:
-            step = int(params['limit'] or 10)
-            offset = max(int(params['page']) - 1, 0) * step
+            step = self.request_int(params['limit'], 'limit', 10)
+            page = self.request_int(params['page'], 'page')
+            offset = max(page - 1, 0) * step
 
         elif params['end']:
-            step = int(params['end']) - offset
+            step = self.request_int(params['end'], 'end') - offset
         else:
-            step = int(params['limit']) if params['limit'] else None
+            step = self.request_int(params['limit'], 'limit')
 
         if step:
             query = query.offset(offset).limit(step)
@@ -1,7 +1,7 @@
 import json
 
 from ..util import Response
-from . import Idiom
+from . import Idiom, split_fields
 
 
 class UnRestIdiom(Idiom):
@@ -12,8 +12,24 @@ class UnRestIdiom(Idiom):
     Serialize data as json.
     Can return a 404 on empty GET if `empty_get_as_404` is set as True in the
     Unrest instance.
+    Restricts the returned fields to the comma separated `fields` query
+    parameter if present.
+    With cursor pagination, reads the `cursor` and `limit` query parameters.
     """
 
+    def request_fields(self, request):
+        return split_fields(request.query.get('fields'))
+
+    def request_cursor(self, request):
+        cursor = request.query.get('cursor', [None])[0]
+        limit = request.query.get('limit', [None])[0]
+        if not limit:
+            return cursor, None
+        try:
+            return cursor, int(limit)
+        except ValueError:
+            self.rest.raise_error(400, f'Invalid limit {limit}')
+
     def request_to_payload(self, request):
         if request.payload:
             try:
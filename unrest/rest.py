@@ -1,15 +1,30 @@
+import json
 import logging
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from contextlib import contextmanager
-from functools import partial
-
-from sqlalchemy import and_, or_
+from contextvars import copy_context
+from decimal import Decimal
+from functools import lru_cache, partial
+from inspect import isawaitable
+from types import MappingProxyType, SimpleNamespace
+
+from sqlalchemy import and_, asc, desc, func, or_, text, tuple_, type_coerce
+from sqlalchemy.dialects import postgresql
 from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import (
+    joinedload, load_only, selectinload, subqueryload, undefer
+)
 from sqlalchemy.orm.query import Query
 from sqlalchemy.orm.strategy_options import Load
+from sqlalchemy.schema import Column
+from sqlalchemy.types import NullType, Numeric
 
 from .coercers import Deserialize, Serialize
 from .generators.options import Options
 from .idiom.unrest import UnRestIdiom
+from .util import (
+    ContextLocals, RequestScope, greenlet_spawn, is_sql_expression, resolve
+)
 
 log = logging.getLogger(__name__)
 
@@ -28,6 +43,292 @@ def _identity(arg):
     return arg
 
 
+# The request scopes of every endpoint, by Rest
+_scopes = ContextLocals('unrest_scopes')
+
+_loaders = {
+    'selectin': selectinload,
+    'joined': joinedload,
+    'subquery': subqueryload,
+}
+
+# Dialect inserts supporting ON CONFLICT
+_upsert_inserts = {'postgresql': postgresql.insert}
+try:
+    from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+except ImportError:  # SQLAlchemy < 1.4
+    pass
+else:
+    _upsert_inserts['sqlite'] = sqlite_insert
+
+# ORM objects can be loaded from INSERT ... RETURNING statements
+try:
+    from sqlalchemy.future import select as future_select
+except ImportError:  # SQLAlchemy < 1.4
+    future_select = None
+
+# Maximum number of bound parameters in one statement per dialect
+_bind_limits = {
+    'sqlite': 999,
+    'postgresql': 32767,
+    'mysql': 65535,
+    'mssql': 2100,
+    'oracle': 1000,
+}
+
+
+def _query_slice(query):
+    """Returns the `query` offset and limit."""
+    if hasattr(query, '_offset_clause'):  # SQLAlchemy >= 1.4
+        return tuple(
+            None if clause is None else clause.value
+            for clause in (query._offset_clause, query._limit_clause)
+        )
+    return query._offset, query._limit
+
+
+def _server_computed(column_property):
+    """
+    Returns True if the `column_property` value is computed by the database:
+    a SQL expression, or a column with a server default or onupdate.
+    """
+    column = column_property.columns[0]
+    return (
+        not isinstance(column, Column)
+        or column.server_default is not None
+        or column.server_onupdate is not None
+    )
+
+
+def _relationship_loaders(rest, key, parent=None):
+    """
+    Yields the loader options eagerly loading the `key` relationship of
+    `rest` and recursively the ones of its relationship rest.
+    """
+    relationship_rest = rest.relationships[key]
+    strategy = rest.relationship_loading.get(key, 'selectin')
+    if strategy == 'lazy' or key not in inspect(rest.Model).relationships:
+        return
+    attribute = getattr(rest.Model, key)
+    if parent is None:
+        loader = _loaders[strategy](attribute)
+    else:
+        loader = getattr(parent, f'{strategy}load')(attribute)
+    yield loader
+    # Relationships are collections, load their deferred columns in bulk
+    for name in relationship_rest.plan.deferred:
+        yield loader.undefer(getattr(relationship_rest.Model, name))
+    for nested_key in relationship_rest.relationships:
+        yield from _relationship_loaders(relationship_rest, nested_key, loader)
+
+
+class Plan(object):
+    """
+    The compiled metadata of a #::unrest.rest#Rest endpoint.
+
+    It is built once, the first time the endpoint metadata is needed, and
+    then cached on the rest endpoint until its configuration changes
+    (see #::unrest.rest.Rest#declare). All its mappings are read-only.
+
+    # Arguments
+        rest: The #::unrest.rest#Rest endpoint to compile.
+    """
+
+    def __init__(self, rest):
+        self.Model = rest.Model
+        self.SerializeClass = rest.SerializeClass
+        self.mapper = inspect(rest.Model)
+        self.primary_keys = tuple(
+            rest._primary_keys
+            or (
+                self.mapper.get_property_by_column(pk).key
+                for pk in self.mapper.primary_key
+            )
+        )
+        self.columns = MappingProxyType(
+            {
+                name: column
+                for name, column in self.mapper.columns.items()
+                if name in self.primary_keys
+                or (
+                    (rest.only is None or name in rest.only)
+                    and not (rest.exclude and name in rest.exclude)
+                )
+            }
+        )
+        self.properties = MappingProxyType(
+            {property.name: property for property in rest.properties}
+        )
+        self.relationships = MappingProxyType(dict(rest.relationships))
+        self.serialize = rest.SerializeClass.compile(
+            self.columns, tuple(self.properties.values()), self.relationships
+        )
+        self.deferred = tuple(
+            name
+            for name in self.columns
+            if self.mapper.column_attrs[name].deferred
+        )
+
+        # In case of column_property or hybrid_property
+        self.pk_columns = MappingProxyType(
+            {
+                pk: self.columns.get(pk, self.properties.get(pk))
+                for pk in self.primary_keys
+            }
+        )
+        self.pk_deserializer = rest.DeserializeClass({}, self.pk_columns)
+        self.serialize_pks = rest.SerializeClass.compile(
+            {
+                pk: column
+                for pk, column in self.columns.items()
+                if pk in self.primary_keys
+            },
+            tuple(
+                self.properties[pk]
+                for pk in self.primary_keys
+                if pk not in self.columns
+            ),
+            {},
+        )
+
+        # Deferred columns left out of collection responses
+        omitted = ()
+        if rest.deferred == 'member':
+            omitted = tuple(
+                name for name in self.deferred if name not in self.primary_keys
+            )
+
+        self.relationship_loaders = MappingProxyType(
+            {
+                key: tuple(_relationship_loaders(rest, key))
+                for key in self.relationships
+            }
+        )
+        relationship_loaders = tuple(
+            loader
+            for loaders in self.relationship_loaders.values()
+            for loader in loaders
+        )
+        self.load_options = relationship_loaders + tuple(
+            undefer(getattr(rest.Model, name)) for name in self.deferred
+        )
+        self.collection_load_options = relationship_loaders + tuple(
+            undefer(getattr(rest.Model, name))
+            for name in self.deferred
+            if name not in omitted
+        )
+
+        # Server computed columns reloaded after batch writes along with
+        # the eager relationships, lazy ones are only expired
+        self.computed = tuple(
+            name
+            for name in self.columns
+            if _server_computed(self.mapper.column_attrs[name])
+        )
+        self.refresh_options = relationship_loaders
+        if self.computed:
+            self.refresh_options += (load_only(*self.computed),)
+        if self.refresh_options:
+            # Populating existing items would expire their deferred columns
+            self.refresh_options += tuple(
+                undefer(getattr(rest.Model, name)) for name in self.deferred
+            )
+        self.lazy_relationships = tuple(
+            key
+            for key, loaders in self.relationship_loaders.items()
+            if not loaders
+        )
+        # Joined eager loads multiply the rows of the collection query
+        self.joined = any(
+            loaders and rest.relationship_loading.get(key) == 'joined'
+            for key, loaders in self.relationship_loaders.items()
+        )
+
+        self.serialize_collection = self.serialize
+        if omitted:
+            self.serialize_collection = rest.SerializeClass.compile(
+                {
+                    name: column
+                    for name, column in self.columns.items()
+                    if name not in omitted
+                },
+                tuple(self.properties.values()),
+                self.relationships,
+            )
+
+        self.sparse = lru_cache(maxsize=128)(partial(SparsePlan, self))
+
+
+class SparsePlan(object):
+    """
+    A #::unrest.rest#Plan narrowed to a set of requested fields.
+
+    Only the requested columns (and the primary keys) are selected and
+    serialized, unless a property is requested or is a primary key, in
+    which case all columns are loaded since properties can depend on any
+    of them.
+
+    # Arguments
+        plan: The full #::unrest.rest#Plan of the endpoint.
+        fields: A frozenset of the requested column, property and
+            relationship names.
+    """
+
+    def __init__(self, plan, fields):
+        columns = {
+            name: column
+            for name, column in plan.columns.items()
+            if name in fields or name in plan.primary_keys
+        }
+        properties = tuple(
+            property
+            for name, property in plan.properties.items()
+            if name in fields or name in plan.primary_keys
+        )
+        relationships = {
+            key: relationship_rest
+            for key, relationship_rest in plan.relationships.items()
+            if key in fields
+        }
+        self.serialize = plan.SerializeClass.compile(
+            columns, properties, relationships
+        )
+        self.serialize_collection = self.serialize
+
+        self.load_options = tuple(
+            loader
+            for key in relationships
+            for loader in plan.relationship_loaders[key]
+        )
+        if properties:
+            self.load_options += tuple(
+                undefer(getattr(plan.Model, name))
+                for name in plan.deferred
+                if name in columns
+            )
+        else:
+            loaded = set(columns)
+            for key in relationships:
+                if key in plan.mapper.relationships:
+                    # Relationships loading needs their local columns
+                    loaded.update(
+                        plan.mapper.get_property_by_column(column).key
+                        for column in plan.mapper.relationships[
+                            key
+                        ].local_columns
+                    )
+            self.load_options += (
+                load_only(
+                    *(
+                        getattr(plan.Model, name)
+                        for name in loaded
+                        if name in plan.mapper.column_attrs
+                    )
+                ),
+            )
+        self.collection_load_options = self.load_options
+
+
 class Rest(object):
     """
     This is the entry point for generating a REST endpoint for a specific model
@@ -62,8 +363,46 @@ class Rest(object):
         properties: A list of additional properties to retrieve on the model.
         relationships: A mapping of relationships and rest endpoints to fetch
             with the model.
+        relationship_loading: A mapping of relationships and the strategy
+            used to eagerly load them on GET: 'selectin' (the default),
+            'joined', 'subquery' or 'lazy' to disable eager loading.
+        deferred: How `deferred` columns are loaded on GET. With 'undefer'
+            (the default) they are loaded in the main query. With 'member'
+            they are left out of collection responses and only returned
+            on GET with primary keys.
+        cursor_pagination: If set to a page size, collection GET are
+            paginated by keyset: the response contains a `next` cursor
+            to give back to get the following page. The idiom sort
+            columns must not be nullable.
+        count: The strategy used to count the occurences of collection GET:
+            'exact' (the default), 'window' to count in the same query with
+            `count(*) OVER ()` (counted exactly with joined relationship
+            loading), 'estimate' to use the database planner
+            estimate when the query is not filtered, 'none' to skip counting
+            or a number to count up to this number.
+        upsert: Set to True to run PUT with primary keys as a single
+            `INSERT ... ON CONFLICT DO UPDATE` statement on PostgreSQL and
+            SQLite. The endpoint query is then not used to look the item up.
+            PUT falls back to the ORM on other dialects or with validators.
+        batch_put: How batch PUT replaces the query elements: 'delete'
+            (the default) deletes them all and inserts the payload ones,
+            'diff' only inserts, updates and deletes the differing ones
+            and reports these `changes` in the response.
         allow_batch: Allow batch operations (PUT, DELETE and PATCH)
             without primary key.
+        returning: What write methods return by default: 'representation'
+            (the default) the reloaded items, or 'minimal' their primary keys
+            only, without reloading them. Requests can choose with a
+            `Prefer: return=minimal` or `Prefer: return=representation`
+            header, answered with a `Preference-Applied` header when
+            honoured (`filter_batch` responses are always minimal).
+        filter_batch: Set to True to run batch DELETE, and batch PATCH
+            without `objects`, as one `DELETE ... WHERE` or `UPDATE ... WHERE`
+            statement on the query filters. Queries joining or selecting
+            from other tables than the model one are rejected with a 400.
+            Rows are never loaded and the response contains the
+            `occurences` count, and the primary keys `objects` on
+            PostgreSQL.
         auth: A decorator that will always be called.
         read_auth: A decorator that will be called on GET.
         write_auth: A decorator that will be called on PUT, POST, DELETE
@@ -98,7 +437,15 @@ class Rest(object):
         query=None,
         properties=None,
         relationships=None,
+        relationship_loading=None,
+        deferred='undefer',
+        cursor_pagination=None,
+        count='exact',
+        upsert=False,
+        batch_put='delete',
         allow_batch=False,
+        returning='representation',
+        filter_batch=False,
         auth=None,
         read_auth=None,
         write_auth=None,
@@ -119,7 +466,7 @@ class Rest(object):
         self.name = name or self.table.name
         self.only = only
         self.exclude = exclude
-        self.query_factory = query or (lambda q: q)
+        self.query_factory = query or _identity
         self.properties = [
             self.unrest.Property(property)
             if not isinstance(property, self.unrest.Property)
@@ -127,8 +474,37 @@ class Rest(object):
             for property in (properties or [])
         ]
         self.relationships = relationships or {}
+        self.relationship_loading = relationship_loading or {}
+        for key, strategy in self.relationship_loading.items():
+            assert strategy == 'lazy' or strategy in _loaders, (
+                f'Unknown loading strategy {strategy} for {key}'
+            )
+        assert deferred in ('undefer', 'member'), (
+            f'Unknown deferred mode {deferred}'
+        )
+        self.deferred = deferred
+        self.cursor_pagination = cursor_pagination
+        assert isinstance(count, int) or count in (
+            'exact',
+            'window',
+            'estimate',
+            'none',
+        ), f'Unknown count strategy {count}'
+        self.count = count
+        self.upsert = upsert
+        assert batch_put in (
+            'delete',
+            'diff',
+        ), f'Unknown batch PUT mode {batch_put}'
+        self.batch_put = batch_put
 
         self.allow_batch = allow_batch
+        assert returning in (
+            'representation',
+            'minimal',
+        ), f'Unknown returning {returning}'
+        self.returning = returning
+        self.filter_batch = filter_batch
 
         self.auth = auth
         self.read_auth = read_auth
@@ -145,7 +521,7 @@ class Rest(object):
         self.SerializeClass = SerializeClass
         self.DeserializeClass = DeserializeClass
 
-        self._query_alterer = _identity
+        self._plan = None
 
         self.overrides = {}
 
@@ -164,12 +540,15 @@ class Rest(object):
             payload: The request content ignored for GET.
             pks: The primary keys in url if any.
         """
+        plan = self.request_plan()
         if self.has(pks):
-            item = self.get_from_pk(self.query, **pks)
-            return self.serialize_all([item] if item else [])
+            item = self.get_from_pk(self.loaded(self.query, plan=plan), **pks)
+            return self.serialize_all([item] if item else [], plan=plan)
 
-        items = self.query
-        return self.serialize_all(items)
+        items = self.loaded(self.query, collection=True, plan=plan)
+        if self.cursor_pagination:
+            return self.serialize_page(items, plan=plan)
+        return self.serialize_all(items, collection=True, plan=plan)
 
     def put(self, payload, **pks):
         """
@@ -196,12 +575,21 @@ class Rest(object):
                     )
                 else:
                     payload[pk] = val
+            if self.can_upsert and self.returns_minimal:
+                self.session.execute(
+                    self.upsert_statement(payload, self.dialect.name)
+                )
+                return self.serialize_minimal([pks])
+            if self.can_upsert:
+                return self.serialize_all([self.upsert_from_pk(payload, pks)])
             existingItem = self.get_from_pk(self.query, **pks)
             item = self.deserialize(payload, existingItem or self.Model())
             self.validate(item)
             if existingItem is None:
                 self.session.add(item)
             self.session.flush()
+            if self.returns_minimal:
+                return self.serialize_minimal([item])
             self.session.expire(item)
             return self.serialize_all([item])
 
@@ -212,23 +600,94 @@ class Rest(object):
                 'if you want to use batch methods.',
             )
 
+        if self.batch_put == 'diff':
+            return self.put_diff(payload)
+
         self.query.delete()
         items = self.deserialize_all(payload)
         self.validate_all(items)
         self.session.add_all(items)
         self.session.flush()
-        self.session.expire_all()
-        return self.serialize_all(items)
+        if self.returns_minimal:
+            return self.serialize_minimal(items)
+        return self.serialize_all(self.refresh_all(items))
+
+    def put_diff(self, payload):
+        """
+        Replace the query elements with the payload ones by only inserting,
+        updating and deleting the differing ones.
+
+        # Returns
+        The serialized items with a `changes` mapping counting the
+        `inserted`, `updated` and `deleted` items.
+        """
+        columns = [getattr(self.Model, pk) for pk in self.primary_keys]
+        existing = set(map(tuple, self.query.with_entities(*columns)))
+
+        objects = payload['objects']
+        keys = [
+            self.payload_pk_key(object)
+            if all(object.get(pk) is not None for pk in self.primary_keys)
+            else None
+            for object in objects
+        ]
+        index = {
+            self.item_pk_key(item): item
+            for item in self.get_all_from_pks(
+                self.query,
+                [
+                    dict(zip(self.primary_keys, key))
+                    for key in keys
+                    if key in existing
+                ],
+            )
+        }
+
+        items = []
+        inserted = []
+        for key, object in zip(keys, objects):
+            item = index.get(key)
+            if item is None:
+                item = self.Model()
+                inserted.append(item)
+            items.append(self.deserialize(object, item))
+        self.validate_all(items)
+        updated = [
+            item
+            for item in index.values()
+            if self.session.is_modified(item, include_collections=False)
+        ]
+        self.session.add_all(inserted)
+
+        deleted = [key for key in existing if key not in index]
+        for criterion in self.pks_criteria(deleted):
+            self.session.query(self.Model).filter(criterion).delete(
+                synchronize_session=False
+            )
+        self.session.flush()
+
+        if self.returns_minimal:
+            rv = self.serialize_minimal(items)
+        else:
+            rv = self.serialize_all(self.refresh_all(items))
+        rv['changes'] = {
+            'inserted': len(inserted),
+            'updated': len(updated),
+            'deleted': len(deleted),
+        }
+        return rv
 
     def post(self, payload, **pks):
         """
         The POST method
 
-        - With no arguments: Add element from request payload.
+        - With no arguments: Add element from request payload, or all the
+            elements of the payload `objects` list in one flush.
         - With primary keys: Correspond to new collection creation. Unused.
 
         # Arguments
-            payload: The request content containing the new element.
+            payload: The request content containing the new element
+                or elements.
             pks: The primary keys in url if any.
         """
         if self.has(pks):
@@ -242,10 +701,23 @@ class Rest(object):
 
         if not payload:
             self.raise_error(400, 'You must provide a payload')
+        if 'objects' not in self.columns and isinstance(
+            payload.get('objects'), list
+        ):
+            items = self.deserialize_all(payload)
+            self.validate_all(items)
+            self.session.add_all(items)
+            self.session.flush()
+            if self.returns_minimal:
+                return self.serialize_minimal(items)
+            return self.serialize_all(self.refresh_all(items))
+
         item = self.deserialize(payload, self.Model())
         self.session.add(item)
         self.validate(item)
         self.session.flush()
+        if self.returns_minimal:
+            return self.serialize_minimal([item])
         self.session.expire(item)
         return self.serialize_all([item])
 
@@ -263,12 +735,17 @@ class Rest(object):
             pks: The primary keys of the element to delete.
         """
         if self.has(pks):
-            item = self.get_from_pk(self.undefered_query, **pks)
+            item = self.get_from_pk(
+                self.query if self.returns_minimal else self.undefered_query,
+                **pks,
+            )
             if item is None:
                 self.raise_error(404, f'{self.name}({pks!r}) not found')
 
             self.session.delete(item)
             self.session.flush()
+            if self.returns_minimal:
+                return self.serialize_minimal([item])
             return self.serialize_all([item])
 
         if not self.allow_batch:
@@ -278,6 +755,18 @@ class Rest(object):
                 'if you want to use batch methods.',
             )
 
+        if self.filter_batch:
+            return self.execute_filtered(self.table.delete())
+
+        if self.returns_minimal:
+            # Only load the primary keys
+            items = self.query.with_entities(
+                *(getattr(self.Model, pk) for pk in self.primary_keys)
+            ).all()
+            self.query.delete()
+            self.session.flush()
+            return self.serialize_minimal(items)
+
         items = self.undefered_query.all()
         self.query.delete()
         self.session.flush()
@@ -314,6 +803,8 @@ class Rest(object):
             self.deserialize(payload, item, blank_missing=False)
             self.validate(item)
             self.session.flush()
+            if self.returns_minimal:
+                return self.serialize_minimal([item])
             self.session.expire(item)
             return self.serialize_all([item])
 
@@ -324,46 +815,108 @@ class Rest(object):
                 'if you want to use batch methods.',
             )
 
+        if self.filter_batch and 'objects' not in payload:
+            return self.patch_filtered(payload)
+
         patches = payload['objects']
+        keys = [self.payload_pk_key(patch) for patch in patches]
         # Get all concerned items
         items = self.get_all_from_pks(
-            self.query,
-            [{pk: patch[pk] for pk in self.primary_keys} for patch in patches],
-        )
-        if len(items) < len(patches):
-            for patch in patches:
-                if (
-                    len(
-                        [
-                            it
-                            for pk in self.primary_keys
-                            for it in items
-                            if getattr(it, pk) == patch[pk]
-                        ]
-                    )
-                    == 0
-                ):
-                    patch = {
-                        key: val
-                        for key, val in patch.items()
-                        if key in self.primary_keys
-                    }
-                    self.raise_error(404, f'{self.name}({patch}) not found')
-
-        for patch in patches:
-            # Get the patch item
-            item = [
-                it
-                for pk in self.primary_keys
-                for it in items
-                if getattr(it, pk) == patch[pk]
-            ][0]
+            self.loaded_query,
+            [dict(zip(self.primary_keys, key)) for key in keys],
+        )
+        index = {self.item_pk_key(item): item for item in items}
+        missing = [
+            {pk: patch[pk] for pk in self.primary_keys}
+            for key, patch in zip(keys, patches)
+            if key not in index
+        ]
+        if missing:
+            self.raise_error(
+                404,
+                f'{self.name}({missing[0]}) not found',
+                extra={'missing': missing},
+            )
+
+        for key, patch in zip(keys, patches):
             # Merge only patched colmuns
-            self.deserialize(patch, item, blank_missing=False)
+            self.deserialize(patch, index[key], blank_missing=False)
         self.validate_all(items)
         self.session.flush()
+        if self.returns_minimal:
+            return self.serialize_minimal(items)
+        return self.serialize_all(self.refresh_all(items))
+
+    def patch_filtered(self, payload):
+        """
+        Patch all the query elements with the payload attributes in one
+        `UPDATE ... WHERE` statement. Validators are run on a transient
+        item holding the payload attributes.
+        """
+        columns = {
+            name: column
+            for name, column in self.columns.items()
+            if name in payload
+            and getattr(column, 'table', None) is self.table
+        }
+        if any(name in self.primary_keys for name in columns):
+            self.raise_error(400, 'Cannot patch primary keys in batch')
+        if not columns:
+            self.raise_error(400, f'No {self.name} column to patch')
+
+        self.set_defaults(payload, columns)
+        item = self.DeserializeClass(payload, columns).merge(self.Model())
+        self.validate(item)
+        return self.execute_filtered(
+            self.table.update().values(
+                {
+                    column.key: getattr(item, name)
+                    for name, column in columns.items()
+                }
+            )
+        )
+
+    def execute_filtered(self, statement):
+        """
+        Execute the `statement` UPDATE or DELETE restricted by the query
+        filters without loading any item.
+
+        # Returns
+        A dict with the `primary_keys`, the `occurences` count of affected
+        rows and their primary keys as `objects` if the dialect supports
+        RETURNING.
+        """
+        query = self.query
+        if _query_slice(query) != (None, None):
+            self.raise_error(400, 'Cannot run a batch on a paginated query')
+        if any(from_ is not self.table for from_ in query.statement.froms):
+            # The statement would lose the join conditions
+            self.raise_error(
+                400, 'Cannot run a filtered batch on a query joining tables'
+            )
+        if query.whereclause is not None:
+            statement = statement.where(query.whereclause)
+
+        columns = [self.mapper.columns[pk] for pk in self.primary_keys]
+        returning = self.dialect.name == 'postgresql' and all(
+            getattr(column, 'table', None) is self.table for column in columns
+        )
+        if returning:
+            statement = statement.returning(*columns)
+
+        result = self.session.execute(statement)
         self.session.expire_all()
-        return self.serialize_all(items)
+        # Items are never returned
+        self.request_scope.minimal = True
+        rv = {
+            'primary_keys': list(self.primary_keys),
+            'occurences': result.rowcount,
+        }
+        if returning:
+            rv['objects'] = [
+                dict(zip(self.primary_keys, row)) for row in result
+            ]
+        return rv
 
     def options(self, payload, **pks):
         """
@@ -400,6 +953,7 @@ class Rest(object):
 
         def register_function(function):
             self.overrides[method] = (function, manual_commit)
+            self._plan = None
             if method not in self.methods:
                 self.register_method(method)
             return function
@@ -429,7 +983,15 @@ class Rest(object):
             'exclude': self.exclude,
             'properties': self.properties,
             'relationships': self.relationships,
+            'relationship_loading': self.relationship_loading,
+            'deferred': self.deferred,
+            'cursor_pagination': self.cursor_pagination,
+            'count': self.count,
+            'upsert': self.upsert,
+            'batch_put': self.batch_put,
             'allow_batch': self.allow_batch,
+            'returning': self.returning,
+            'filter_batch': self.filter_batch,
             'auth': self.auth,
             'read_auth': self.read_auth,
             'write_auth': self.write_auth,
@@ -455,18 +1017,33 @@ class Rest(object):
         ):
             return {}
 
-        # In case of column_property or hybrid_property
-        prop_by_name = {prop.name: prop for prop in self.properties}
-        columns = {
-            pk: self.columns.get(pk, prop_by_name.get(pk))
-            for pk in self.primary_keys
-        }
-        deserialize = self.DeserializeClass(parameters, columns)
+        deserializer = self.plan.pk_deserializer
         return {
-            name: deserialize.deserialize(name, column)
-            for name, column in columns.items()
+            name: deserializer.deserialize(name, column, parameters)
+            for name, column in self.plan.pk_columns.items()
         }
 
+    def payload_pk_key(self, payload):
+        """
+        Returns the deserialized primary keys tuple of a payload item.
+
+        # Raises
+            RestError: 400 if a primary key is missing from the item.
+        """
+        deserializer = self.plan.pk_deserializer
+        key = []
+        for name, column in self.plan.pk_columns.items():
+            if payload.get(name) is None:
+                self.raise_error(
+                    400, f'Missing primary key {name} in {self.name} item'
+                )
+            key.append(deserializer.deserialize(name, column, payload))
+        return tuple(key)
+
+    def item_pk_key(self, item):
+        """Returns the primary keys tuple of a model instance."""
+        return tuple(getattr(item, pk) for pk in self.primary_keys)
+
     def deserialize(self, payload, item, blank_missing=True):
         """
         Deserialize the payload item in the provided item.
@@ -502,11 +1079,9 @@ class Rest(object):
 
     def serialize(self, item):
         """Serialize an `item` with the given `SerializeClass`"""
-        return self.SerializeClass(
-            item, self.columns, self.properties, self.relationships
-        ).dict()
+        return self.plan.serialize(item)
 
-    def serialize_all(self, items):
+    def serialize_all(self, items, collection=False, plan=None):
         """
         Serialize all items and return a mapping containing:
 
@@ -516,26 +1091,334 @@ class Rest(object):
         - objects: The serialized objects
         - primary_keys: The list of primary keys defined for this rest
             endpoint
-        - occurences: The number of total occurences (without limit)
+        - occurences: The number of total occurences (without limit),
+            computed according to the `count` strategy
+        - count: The strategy used to count the occurences if not exact
         - offset if there's a query offset
         - limit if there's a query limit
+
+        # Arguments
+            items: A query or a list of items to serialize
+            collection: Set to True when serializing a collection GET
+                response, which may leave deferred columns out
+            plan: The plan to serialize with, defaults to #plan
         """
+        plan = plan or self.plan
 
         rv = {}
-        rv['primary_keys'] = self.primary_keys
+        rv['primary_keys'] = list(self.primary_keys)
 
+        count = None
         if isinstance(items, Query):
-            rv['occurences'] = items.offset(None).limit(None).count()
-            if items._offset is not None:
-                rv['offset'] = items._offset
-            if items._limit is not None:
-                rv['limit'] = items._limit
-
-        rv['objects'] = [self.serialize(item) for item in items]
-        if 'occurences' not in rv:
+            offset, limit = _query_slice(items)
+            if offset is not None:
+                rv['offset'] = offset
+            if limit is not None:
+                rv['limit'] = limit
+            if self.count == 'window' and not self.plan.joined:
+                # Count all occurences in the same query
+                query = items
+                rows = query.add_columns(func.count().over()).all()
+                items = [row[0] for row in rows]
+                if rows:
+                    rv['occurences'], count = rows[0][-1], 'window'
+                elif not offset:
+                    rv['occurences'], count = 0, 'window'
+                else:
+                    # Offset past the end, count separately
+                    rv['occurences'], count = self.count_occurences(
+                        query, 'exact'
+                    )
+            else:
+                rv['occurences'], count = self.count_occurences(items)
+
+        if collection:
+            serialize = plan.serialize_collection
+        else:
+            serialize = plan.serialize
+        rv['objects'] = [serialize(item) for item in items]
+        if count is None:
             rv['occurences'] = len(rv['objects'])
+        elif count == 'none':
+            del rv['occurences']
+        if count not in (None, 'exact'):
+            rv['count'] = count
         return rv
 
+    def serialize_minimal(self, items):
+        """
+        Serialize only the primary keys of `items` for `return=minimal`
+        responses, without reloading them.
+
+        # Arguments
+            items: The items, rows or mappings holding the primary keys
+
+        # Returns
+        A dict containing the `primary_keys`, the `occurences` count and
+        the primary keys `objects`.
+        """
+        serialize = self.plan.serialize_pks
+        return {
+            'primary_keys': list(self.primary_keys),
+            'occurences': len(items),
+            'objects': [
+                serialize(
+                    SimpleNamespace(**item) if isinstance(item, dict) else item
+                )
+                for item in items
+            ],
+        }
+
+    @property
+    def returns_minimal(self):
+        """
+        True if the current write request must only return primary keys,
+        from its `Prefer` header or the endpoint `returning` default.
+        """
+        preference = self._request and self.preferred_return(self._request)
+        return (preference or self.returning) == 'minimal'
+
+    def preferred_return(self, request):
+        """
+        Returns the `return` preference of the `request` `Prefer` header
+        ('minimal' or 'representation') or None.
+        """
+        for preference in (request.headers.get('Prefer') or '').split(','):
+            name, _, value = preference.strip().partition('=')
+            if name.lower() == 'return' and value in (
+                'minimal',
+                'representation',
+            ):
+                return value
+
+    def count_occurences(self, query, strategy=None):
+        """
+        Count the occurences of `query` without offset and limit.
+
+        # Arguments
+            query: The query to count
+            strategy: The count strategy, defaults to the `count` option.
+                'window' is counted as 'exact' here.
+
+        # Returns
+        A tuple of the occurences and the strategy actually used.
+        """
+        strategy = strategy or self.count
+        query = query.offset(None).limit(None).order_by(None)
+        if strategy == 'none':
+            return None, 'none'
+        if strategy == 'estimate':
+            estimate = self.estimate_occurences(query)
+            if estimate is not None:
+                return estimate, 'estimate'
+        if isinstance(strategy, int):
+            occurences = (
+                self.session.query(func.count())
+                .select_from(query.limit(strategy + 1).subquery())
+                .scalar()
+            )
+            if occurences > strategy:
+                return strategy, 'capped'
+            return occurences, 'exact'
+        return query.count(), 'exact'
+
+    def estimate_occurences(self, query):
+        """
+        Returns the planner estimate of the table row count if `query`
+        is not filtered and the database has one, None otherwise.
+        """
+        if query.whereclause is not None:
+            return None
+        dialect = self.dialect.name
+        if dialect == 'postgresql':
+            estimate = self.session.execute(
+                text(
+                    'SELECT reltuples FROM pg_class '
+                    'WHERE oid = to_regclass(:table)'
+                ),
+                {'table': self.table.fullname},
+            ).scalar()
+            if estimate is not None and estimate >= 0:
+                return int(estimate)
+        elif dialect == 'sqlite':
+            if self.session.execute(
+                text(
+                    "SELECT 1 FROM sqlite_master "
+                    "WHERE type = 'table' AND name = 'sqlite_stat1'"
+                )
+            ).scalar():
+                stat = self.session.execute(
+                    text('SELECT stat FROM sqlite_stat1 WHERE tbl = :table'),
+                    {'table': self.table.name},
+                ).scalar()
+                if stat:
+                    return int(stat.split()[0])
+        return None
+
+    def serialize_page(self, query, plan=None):
+        """
+        Serialize the page of `query` items following the request cursor
+        and return the same mapping as #serialize_all without offset and
+        with a `next` cursor if there are more items.
+
+        # Arguments
+            query: The collection query
+            plan: The plan to serialize with, defaults to #plan
+        """
+        plan = plan or self.plan
+        cursor, limit = None, None
+        if self._request:
+            cursor, limit = self.idiom.request_cursor(self._request)
+        if limit is None:
+            limit = self.cursor_pagination
+        if limit < 1:
+            self.raise_error(400, f'Invalid limit {limit}')
+        keyset = self.keyset(
+            self.idiom.request_sort(self._request) if self._request else []
+        )
+
+        query = query.offset(None).limit(None)
+        rv = {}
+        rv['primary_keys'] = list(self.primary_keys)
+        rv['occurences'], count = self.count_occurences(
+            query, 'exact' if self.count == 'window' else None
+        )
+        if count == 'none':
+            del rv['occurences']
+        if count != 'exact':
+            rv['count'] = count
+
+        query = query.order_by(None).order_by(
+            *(
+                desc(attribute) if descending else asc(attribute)
+                for name, attribute, descending in keyset
+            )
+        )
+        if cursor:
+            query = query.filter(
+                self.seek(keyset, self.decode_cursor(keyset, cursor))
+            )
+        # Select the keyset values as the database compares them
+        rows = (
+            query.add_columns(
+                *(
+                    type_coerce(attribute, NullType())
+                    if isinstance(attribute.type, Numeric)
+                    else attribute
+                    for name, attribute, descending in keyset
+                )
+            )
+            .limit(limit + 1)
+            .all()
+        )
+
+        serialize = plan.serialize_collection
+        rv['objects'] = [serialize(row[0]) for row in rows[:limit]]
+        rv['limit'] = limit
+        if len(rows) > limit:
+            rv['next'] = self.encode_cursor(keyset, rows[limit - 1][1:])
+        return rv
+
+    def keyset(self, sort):
+        """
+        Returns the list of `(name, attribute, descending)` ordering a
+        cursor paginated collection: the `sort` ones followed by the primary
+        keys which make it unique.
+
+        # Arguments
+            sort: A list of `(name, descending)` as returned by
+                #::unrest.idiom.Idiom#request_sort
+        """
+        keyset = []
+        for name, descending in sort:
+            attribute = getattr(self.Model, name, None)
+            if (
+                name not in self.mapper.column_attrs
+                and name not in self.plan.properties
+            ) or not is_sql_expression(attribute):
+                self.raise_error(400, f'Cannot paginate on {name}')
+            keyset.append((name, attribute, descending))
+        sorted_names = [name for name, descending in sort]
+        for pk in self.primary_keys:
+            if pk not in sorted_names:
+                keyset.append((pk, getattr(self.Model, pk), False))
+        return keyset
+
+    def seek(self, keyset, values):
+        """
+        Returns the filter selecting the items after `values` in the
+        `keyset` order.
+        """
+        attributes = [attribute for name, attribute, descending in keyset]
+        directions = {descending for name, attribute, descending in keyset}
+        if len(directions) == 1 and (
+            len(keyset) == 1
+            or self.dialect.name in ('postgresql', 'sqlite', 'mysql')
+        ):
+            # Row value comparison: (sort, pk) > (...)
+            left, right = tuple_(*attributes), tuple_(*values)
+            if len(keyset) == 1:
+                left, right = attributes[0], values[0]
+            return left < right if directions.pop() else left > right
+
+        return or_(
+            *(
+                and_(
+                    *(
+                        attribute == value
+                        for attribute, value in zip(attributes[:i], values)
+                    ),
+                    attributes[i] < values[i]
+                    if descending
+                    else attributes[i] > values[i],
+                )
+                for i, (name, attribute, descending) in enumerate(keyset)
+            )
+        )
+
+    def encode_cursor(self, keyset, values):
+        """
+        Returns the opaque cursor pointing after the item of `keyset`
+        `values`. Numeric values are the raw database ones, kept without
+        loss (decimals as strings).
+        """
+        serializer = self.SerializeClass(None, {}, [], {})
+        values = [
+            (str(value) if isinstance(value, Decimal) else value)
+            if isinstance(attribute.type, Numeric)
+            else serializer._serialize(attribute.type, value)
+            for (name, attribute, descending), value in zip(keyset, values)
+        ]
+        return urlsafe_b64encode(json.dumps(values).encode('utf-8')).decode(
+            'ascii'
+        )
+
+    def decode_cursor(self, keyset, cursor):
+        """
+        Returns the keyset values of the opaque `cursor`.
+
+        # Raises
+        A #::unrest.UnRest#RestError 400 on invalid cursor
+        """
+        try:
+            values = json.loads(urlsafe_b64decode(cursor.encode('ascii')))
+        except ValueError:
+            values = None
+        if not isinstance(values, list) or len(values) != len(keyset):
+            self.raise_error(400, f'Invalid cursor {cursor}')
+        deserializer = self.DeserializeClass({}, {})
+        try:
+            return [
+                (Decimal(value) if isinstance(value, str) else value)
+                if isinstance(attribute.type, Numeric)
+                else deserializer._deserialize(attribute.type, value)
+                for (name, attribute, descending), value in zip(
+                    keyset, values
+                )
+            ]
+        except ArithmeticError:
+            self.raise_error(400, f'Invalid cursor {cursor}')
+
     def set_defaults(self, payload, columns):
         """Sets in payload item all the fixed and defaults values"""
         for name, column in columns.items():
@@ -583,12 +1466,14 @@ class Rest(object):
                         setattr(
                             item,
                             key,
-                            validator(
-                                self.Validatable(
-                                    getattr(item, key),
-                                    key,
-                                    item,
-                                    self.unrest.ValidationError,
+                            resolve(
+                                validator(
+                                    self.Validatable(
+                                        getattr(item, key),
+                                        key,
+                                        item,
+                                        self.unrest.ValidationError,
+                                    )
                                 )
                             ),
                         )
@@ -646,6 +1531,11 @@ class Rest(object):
             return value of the wrapped function to return
             the #::unrest.util#Response
 
+        all within the #::unrest.UnRest#request_session lifecycle.
+
+        If the UnRest session is an `AsyncSession`, it returns the
+        #async_route coroutine instead.
+
         # Arguments
             method: The HTTP method which is curried in a partial
             request: The current #::unrest.util#Request
@@ -653,16 +1543,58 @@ class Rest(object):
         # Returns
         The #::unrest.util#Response of this request
         """
-        try:
-            pks = self.parameters_to_pks(request.parameters)
-            payload = self.idiom.request_to_payload(request)
-            return self.wrap_auth_route(method, self.inner_route)(
-                request, payload, **pks
-            )
-        except self.unrest.RestError as e:
-            return self.idiom.data_to_response(
-                dict(message=e.message, **e.extra), request, e.status
-            )
+        if self.unrest.is_async:
+            return self.async_route(method, request)
+
+        with self.unrest.request_session():
+            try:
+                pks = self.parameters_to_pks(request.parameters)
+                payload = self.idiom.request_to_payload(request)
+                return resolve(
+                    self.wrap_auth_route(method, self.inner_route)(
+                        request, payload, **pks
+                    )
+                )
+            except self.unrest.RestError as e:
+                return self.idiom.data_to_response(
+                    dict(message=e.message, **e.extra), request, e.status
+                )
+
+    async def async_route(self, method, request):
+        """
+        The #route coroutine for `AsyncSession`.
+
+        The auth wrappers can be coroutines. The #inner_route runs in a
+        greenlet on the synchronous session of the `AsyncSession`, where
+        awaitable validators and overrides are awaited. Relationships and
+        deferred columns are loaded eagerly as declared.
+
+        # Arguments
+            method: The HTTP method which is curried in a partial
+            request: The current #::unrest.util#Request
+
+        # Returns
+        The #::unrest.util#Response of this request
+        """
+        async with self.unrest.async_request_session():
+            try:
+                pks = self.parameters_to_pks(request.parameters)
+                payload = self.idiom.request_to_payload(request)
+                route = self.wrap_auth_route(method, self.async_inner_route)
+                response = route(request, payload, **pks)
+                if isawaitable(response):
+                    response = await response
+                return response
+            except self.unrest.RestError as e:
+                return self.idiom.data_to_response(
+                    dict(message=e.message, **e.extra), request, e.status
+                )
+
+    async def async_inner_route(self, request, payload, **pks):
+        """The #inner_route run in a greenlet for `AsyncSession`."""
+        return await greenlet_spawn(
+            copy_context().run, self.inner_route, request, payload, **pks
+        )
 
     def wrap_auth_route(self, method, route):
         """This takes a route and apply auth wrappers around it."""
@@ -693,20 +1625,35 @@ class Rest(object):
         if method in self.overrides:
             route, manual_commit = self.overrides[method]
 
-        with self.query_request(request):
-            data = route(payload, **pks)
-
-        if not manual_commit and method in ['PUT', 'POST', 'DELETE', 'PATCH']:
-            self.session.commit()
-
-        occurences = (
-            f": {data['occurences']} occurences"
-            if 'occurences' in data
-            else ''
-        )
-        log.info(f'{method} {self.path}{occurences}')
+        with self.query_request(request, payload) as scope:
+            data = resolve(route(payload, **pks))
+
+            if not manual_commit and method in [
+                'PUT',
+                'POST',
+                'DELETE',
+                'PATCH',
+            ]:
+                self.session.commit()
+
+            occurences = (
+                f": {data['occurences']} occurences"
+                if 'occurences' in data
+                else ''
+            )
+            log.info(
+                f'{method} {self.path}{occurences} '
+                f'in {scope.duration * 1000:.1f}ms'
+            )
 
-        return self.idiom.data_to_response(data, request)
+            response = self.idiom.data_to_response(data, request)
+        preference = self.preferred_return(request)
+        if preference and method in ['PUT', 'POST', 'DELETE', 'PATCH']:
+            if method not in self.overrides and not (
+                scope.minimal and preference == 'representation'
+            ):
+                response.headers['Preference-Applied'] = f'return={preference}'
+        return response
 
     def register_method(self, method):
         """
@@ -725,6 +1672,7 @@ class Rest(object):
 
         route = partial(self.route, method)
         route.__name__ = '_'.join((method,) + self.name_parts)
+        route.rest = self
         self.unrest.framework.register_route(
             self.path, method, self.primary_keys, route
         )
@@ -747,34 +1695,205 @@ class Rest(object):
             query = query.filter(getattr(self.Model, key) == val)
         return query.first()
 
+    @property
+    def can_upsert(self):
+        """
+        Returns True if PUT can be run as an upsert statement: `upsert` is
+        set, the dialect supports it, there are no validators, the endpoint
+        query is not filtered (the upsert would reach rows it can't see)
+        and the rest primary keys are the table ones.
+        """
+        return (
+            self.upsert
+            and not self.validators
+            and self.query_factory is _identity
+            and self.dialect.name in _upsert_inserts
+            and len(self.mapper.tables) == 1
+            and {
+                self.mapper.columns[pk] for pk in self.primary_keys
+            } == set(self.table.primary_key.columns)
+        )
+
+    def upsert_from_pk(self, payload, pks):
+        """
+        Insert or update the item with `pks` from the `payload` in one
+        `INSERT ... ON CONFLICT DO UPDATE` statement.
+
+        On PostgreSQL, an endpoint without relationships gets the item back
+        from the statement `RETURNING` clause (SQLAlchemy >= 1.4), others
+        load it with a second query.
+
+        # Returns
+        The upserted item loaded for serialization.
+        """
+        statement = self.upsert_statement(payload, self.dialect.name)
+        if (
+            self.dialect.name == 'postgresql'
+            and future_select is not None
+            and not self.relationships
+        ):
+            item = (
+                self.session.execute(
+                    future_select(self.Model)
+                    .from_statement(statement.returning(*self.table.columns))
+                    .execution_options(populate_existing=True)
+                )
+                .scalars()
+                .first()
+            )
+            # ON CONFLICT DO NOTHING returns no row on conflict
+            if item is not None:
+                return item
+        else:
+            self.session.execute(statement)
+        return self.get_from_pk(
+            self.loaded(self.session.query(self.Model).populate_existing()),
+            **pks,
+        )
+
+    def upsert_statement(self, payload, dialect):
+        """
+        Returns the `dialect` `INSERT ... ON CONFLICT DO UPDATE` statement
+        of the `payload` item on the table primary keys.
+        """
+        self.set_defaults(payload, self.columns)
+        deserializer = self.DeserializeClass(payload, self.columns)
+        values = {
+            column.key: deserializer.deserialize(name, column, payload)
+            for name, column in self.columns.items()
+            if getattr(column, 'table', None) is self.table
+        }
+        keys = [column.key for column in self.table.primary_key.columns]
+        statement = _upsert_inserts[dialect](self.table).values(values)
+        updates = {
+            key: statement.excluded[key] for key in values if key not in keys
+        }
+        if not updates:
+            return statement.on_conflict_do_nothing(index_elements=keys)
+        return statement.on_conflict_do_update(
+            index_elements=keys, set_=updates
+        )
+
     def get_all_from_pks(self, query, items_pks):
         """
         Get all items from `query` correponding to the primary keys `items_pks`
-        in one query.
-        """
-        return query.filter(
-            or_(
-                *[
-                    and_(
-                        *[
-                            getattr(self.Model, key) == val
-                            for key, val in pks.items()
-                        ]
+        in as few queries as the dialect bound parameters limit allows.
+        """
+        keys = list(
+            dict.fromkeys(
+                tuple(pks[name] for name in self.primary_keys)
+                for pks in items_pks
+            )
+        )
+        items = []
+        for criterion in self.pks_criteria(keys, query):
+            items.extend(query.filter(criterion).all())
+        return items
+
+    def pks_criteria(self, keys, query=None):
+        """
+        Yields the criteria selecting the primary keys tuples `keys` in
+        chunks under the dialect bound parameters limit, minus the
+        parameters already bound by the filters of `query` if given.
+
+        A single primary key is looked up with `IN`, composite ones with a
+        tuple `IN` when the dialect supports it and a disjunction of
+        conjunctions otherwise.
+        """
+        columns = [getattr(self.Model, name) for name in self.primary_keys]
+        dialect = self.dialect
+        limit = _bind_limits.get(dialect.name, 999)
+        if query is not None:
+            limit -= sum(
+                len(value) if isinstance(value, (list, tuple)) else 1
+                for value in query.statement.compile(dialect=dialect)
+                .params.values()
+            )
+        size = max(limit // len(columns), 1)
+
+        for start in range(0, len(keys), size):
+            end = start + size
+            chunk = keys[start:end]
+            if len(columns) == 1:
+                yield columns[0].in_([key[0] for key in chunk])
+            elif dialect.name in ('postgresql', 'mysql') or getattr(
+                dialect, 'tuple_in_values', False
+            ):
+                yield tuple_(*columns).in_(chunk)
+            else:
+                yield or_(
+                    *(
+                        and_(
+                            *(
+                                column == value
+                                for column, value in zip(columns, key)
+                            )
+                        )
+                        for key in chunk
                     )
-                    for pks in items_pks
-                ]
+                )
+
+    def refresh_all(self, items):
+        """
+        Refresh the flushed `items` server computed attributes (SQL
+        expressions, server defaults and onupdates) and eagerly loaded
+        relationships in bulk, leaving their other attributes and the other
+        session objects untouched.
+
+        # Returns
+        The `items`.
+        """
+        plan = self.plan
+        if plan.lazy_relationships:
+            for item in items:
+                self.session.expire(item, plan.lazy_relationships)
+        if items and plan.refresh_options:
+            self.get_all_from_pks(
+                self.session.query(self.Model)
+                .options(*plan.refresh_options)
+                .populate_existing(),
+                [
+                    dict(zip(self.primary_keys, self.item_pk_key(item)))
+                    for item in items
+                ],
             )
-        ).all()
+        return items
 
     @contextmanager
-    def query_request(self, request):
+    def query_request(self, request, payload=None):
         """
-        Context manager that sets the `_query_alterer` to the idiom alter_query
-        and restore it to identity at exit.
+        Context manager that enters a #::unrest.util#RequestScope for
+        `request`, with the idiom alter_query as query alterer, and leaves
+        it at exit.
+
+        The scope is stored in a context variable so concurrent requests
+        served by threads or asyncio tasks never see each other state.
         """
-        self._query_alterer = partial(self.idiom.alter_query, request)
-        yield
-        self._query_alterer = _identity
+        scope = RequestScope(
+            request, partial(self.idiom.alter_query, request), payload
+        )
+        token = _scopes.set(self, scope)
+        try:
+            yield scope
+        finally:
+            _scopes.reset(token)
+
+    @property
+    def request_scope(self):
+        """The current #::unrest.util#RequestScope or None."""
+        return _scopes.get(self)
+
+    @property
+    def _request(self):
+        """The #::unrest.util#Request being handled or None."""
+        scope = self.request_scope
+        return scope and scope.request
+
+    @property
+    def _query_alterer(self):
+        """The query alterer of the request being handled."""
+        scope = self.request_scope
+        return scope.query_alterer if scope else _identity
 
     @property
     def session(self):
@@ -789,6 +1908,37 @@ class Rest(object):
             query = self.session.query(self.Model)
         return self._query_alterer(self.query_factory(query))
 
+    def loaded(self, query, collection=False, plan=None):
+        """
+        Returns the `query` with the loader options needed for serialization:
+        declared relationships are eagerly loaded and serialized deferred
+        columns are undeferred.
+
+        # Arguments
+            query: The query to add loader options to
+            collection: Set to True if the query is used for a collection
+                response, which may leave deferred columns out
+            plan: The plan to get loader options from, defaults to #plan
+        """
+        plan = plan or self.plan
+        if collection:
+            load_options = plan.collection_load_options
+        else:
+            load_options = plan.load_options
+        if not load_options:
+            return query
+        return query.options(*load_options)
+
+    @property
+    def loaded_query(self):
+        """Gets the query with the loader options needed for serialization."""
+        return self.loaded(self.query)
+
+    @property
+    def dialect(self):
+        """Gets the sqlalchemy dialect of the session bind for this Model."""
+        return self.session.get_bind(self.mapper).dialect
+
     @property
     def undefered_query(self):
         """Gets the query with all attributes undefered."""
@@ -814,33 +1964,51 @@ class Rest(object):
         """This Model table name."""
         return self.Model.__table__
 
+    @property
+    def plan(self):
+        """
+        Gets the #::unrest.rest#Plan of this endpoint,
+        compiling it if needed.
+        """
+        if self._plan is None:
+            self._plan = Plan(self)
+        return self._plan
+
+    def request_plan(self):
+        """
+        Returns the plan of the current request: the #plan narrowed to the
+        fields requested through the idiom if any.
+
+        # Raises
+        A #::unrest.UnRest#RestError 400 on unknown fields
+        """
+        fields = self._request and self.idiom.request_fields(self._request)
+        if not fields:
+            return self.plan
+
+        plan = self.plan
+        unknown = [
+            field
+            for field in fields
+            if field not in plan.columns
+            and field not in plan.properties
+            and field not in plan.relationships
+        ]
+        if unknown:
+            self.raise_error(400, f'Unknown fields: {", ".join(unknown)}')
+        return plan.sparse(frozenset(fields))
+
     @property
     def mapper(self):
         """Get the SQLAlchemy mapper of this Model."""
-        return inspect(self.Model)
+        return self.plan.mapper
 
     @property
     def primary_keys(self):
         """This model primary keys names."""
-        if self._primary_keys:
-            return self._primary_keys
-
-        return [
-            self.mapper.get_property_by_column(pk).key
-            for pk in self.mapper.primary_key
-        ]
+        return self.plan.primary_keys
 
     @property
     def columns(self):
         """Gets all columns of this model `column_property` included."""
-
-        def gen():
-            for name, column in self.mapper.columns.items():
-                if name not in self.primary_keys:
-                    if self.only is not None and name not in self.only:
-                        continue
-                    if self.exclude and name in self.exclude:
-                        continue
-                yield name, column
-
-        return dict(gen())
+        return self.plan.columns
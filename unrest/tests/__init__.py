@@ -1,2 +1,35 @@
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from ..framework import Framework
+
+
 def idsorted(it, key='id'):
     return sorted(it, key=lambda x: x[key])
+
+
+@contextmanager
+def statements(engine):
+    """Collects the sql statements executed on `engine`."""
+    executed = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        executed.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+    try:
+        yield executed
+    finally:
+        event.remove(engine, 'before_cursor_execute', before_cursor_execute)
+
+
+class RoutesFramework(Framework):
+    """A framework keeping the routes by path and method to call them."""
+
+    def __init__(self, app, url):
+        super().__init__(app, url)
+        self.routes = {}
+
+    def register_route(self, path, method, parameters, function):
+        self.routes[path, method] = function
@@ -1,9 +1,12 @@
 import pytest
 
+from .helpers.aiohttp import AiohttpClient
+from .helpers.asgi import AsgiClient
 from .helpers.flask import FlaskClient
 from .helpers.http_server import HTTPServerClient
 from .helpers.sanic import SanicClient
 from .helpers.tornado import TornadoClient
+from .helpers.wsgi import WsgiClient
 
 
 @pytest.fixture(
@@ -13,6 +16,9 @@ from .helpers.tornado import TornadoClient
         pytest.param(HTTPServerClient, marks=pytest.mark.http_server),
         pytest.param(TornadoClient, marks=pytest.mark.tornado),
         pytest.param(SanicClient, marks=pytest.mark.sanic),
+        pytest.param(AiohttpClient, marks=pytest.mark.aiohttp),
+        pytest.param(AsgiClient, marks=pytest.mark.asgi),
+        pytest.param(WsgiClient, marks=pytest.mark.wsgi),
     ],
 )
 def client_class(request):
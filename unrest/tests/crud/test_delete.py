@@ -1,5 +1,6 @@
+from ...idiom.json_server import JsonServerIdiom
 from ...unrest import UnRest
-from .. import idsorted
+from .. import idsorted, statements
 from ..model import Fruit, Tree
 
 
@@ -81,3 +82,52 @@ def test_delete_fruits(client):
     assert code == 200
     assert json['occurences'] == 0
     assert idsorted(json['objects']) == []
+
+
+def test_delete_fruits_filtered(client):
+    rest = UnRest(
+        client.app,
+        client.session,
+        idiom=JsonServerIdiom,
+        framework=client.__framework__,
+    )
+    rest(Fruit, methods=['GET', 'DELETE'], allow_batch=True, filter_batch=True)
+    with statements(client.engine) as executed:
+        code, json = client.fetch('/api/fruit?tree_id=1', method="DELETE")
+    assert code == 200
+    assert json == {'primary_keys': ['fruit_id'], 'occurences': 3}
+    assert len(executed) == 1
+    assert executed[0].startswith('DELETE FROM fruit WHERE')
+
+    code, json = client.fetch('/api/fruit')
+    assert code == 200
+    assert [fruit['fruit_id'] for fruit in idsorted(json, 'fruit_id')] == [
+        4,
+        5,
+    ]
+
+
+def test_delete_fruits_filtered_joined_query(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(
+        Fruit,
+        methods=['GET', 'DELETE', 'PATCH'],
+        allow_batch=True,
+        filter_batch=True,
+        query=lambda q: q.join(Tree).filter(Tree.name == 'pine'),
+    )
+    code, json = client.fetch('/api/fruit', method="DELETE")
+    assert code == 400
+    assert json['message'] == (
+        'Cannot run a filtered batch on a query joining tables'
+    )
+    code, json = client.fetch(
+        '/api/fruit', method="PATCH", json={'color': 'pink'}
+    )
+    assert code == 400
+
+    code, json = client.fetch('/api/fruit')
+    assert code == 200
+    assert json['occurences'] == 3
+    assert 'pink' not in [fruit['color'] for fruit in json['objects']]
+    assert client.session.query(Fruit).count() == 5
@@ -1,7 +1,8 @@
 from datetime import timedelta
 
+from ...idiom.json_server import JsonServerIdiom
 from ...unrest import UnRest
-from .. import idsorted
+from .. import idsorted, statements
 from ..model import Fruit, Tree
 
 
@@ -62,6 +63,40 @@ def test_patch_missing_tree(client):
     assert code == 404
 
 
+def test_patch_missing_trees_reported(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Tree, methods=['GET', 'PATCH'], allow_batch=True)
+    code, json = client.fetch(
+        '/api/tree',
+        method="PATCH",
+        json={
+            'objects': [
+                {'id': 8, 'name': 'cedar'},
+                {'id': 2, 'name': 'mango'},
+                {'id': 9, 'name': 'palm'},
+            ]
+        },
+    )
+    assert code == 404
+    assert json['message'] == "tree({'id': 8}) not found"
+    assert json['missing'] == [{'id': 8}, {'id': 9}]
+
+    code, json = client.fetch('/api/tree/2')
+    assert json['objects'] == [{'id': 2, 'name': 'maple'}]
+
+
+def test_patch_tree_without_primary_key(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Tree, methods=['GET', 'PATCH'], allow_batch=True)
+    code, json = client.fetch(
+        '/api/tree',
+        method="PATCH",
+        json={'objects': [{'id': 1, 'name': 'cedar'}, {'name': 'mango'}]},
+    )
+    assert code == 400
+    assert json['message'] == 'Missing primary key id in tree item'
+
+
 def test_patch_fruit(client):
     rest = UnRest(client.app, client.session, framework=client.__framework__)
     rest(Fruit, methods=['GET', 'PATCH'], allow_batch=True)
@@ -162,3 +197,146 @@ def test_patch_fruit(client):
             'tree_id': 1,
         },
     ]
+
+
+def test_patch_trees_lookup_is_chunked(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    tree = rest(Tree, methods=['GET', 'PATCH'], allow_batch=True)
+    with statements(client.engine) as executed:
+        items = tree.get_all_from_pks(
+            tree.query, [{'id': id} for id in range(1, 2001)]
+        )
+    assert sorted(item.name for item in items) == ['maple', 'oak', 'pine']
+    assert len(executed) == 3
+    assert all(' IN (' in statement for statement in executed)
+
+
+def test_patch_trees_lookup_chunks_count_query_parameters(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    tree = rest(
+        Tree,
+        methods=['GET', 'PATCH'],
+        allow_batch=True,
+        # 998 bound parameters, leaving one per lookup chunk on sqlite
+        query=lambda q: q.filter(Tree.id.notin_(range(10, 1008))),
+    )
+    with statements(client.engine) as executed:
+        items = tree.get_all_from_pks(
+            tree.query, [{'id': id} for id in range(1, 4)]
+        )
+    assert sorted(item.name for item in items) == ['maple', 'oak', 'pine']
+    assert len(executed) == 3
+
+
+def test_patch_fruits_filtered(client):
+    def size_validator(field):
+        if field.value > 10:
+            raise field.ValidationError('Too big')
+        return field.value * 2
+
+    rest = UnRest(
+        client.app,
+        client.session,
+        idiom=JsonServerIdiom,
+        framework=client.__framework__,
+    )
+    rest(
+        Fruit,
+        methods=['GET', 'PATCH'],
+        only=['color', 'size', 'double_size'],
+        allow_batch=True,
+        filter_batch=True,
+        validators={'size': size_validator},
+    )
+    with statements(client.engine) as executed:
+        code, json = client.fetch(
+            '/api/fruit?tree_id=1',
+            method="PATCH",
+            json={'size': 3, 'double_size': 1, 'color': 'pink'},
+        )
+    assert code == 200
+    assert json == {'primary_keys': ['fruit_id'], 'occurences': 3}
+    assert len(executed) == 1
+    assert executed[0].startswith('UPDATE fruit SET')
+
+    code, json = client.fetch('/api/fruit?color=pink')
+    assert code == 200
+    assert idsorted(json, 'fruit_id') == [
+        {'fruit_id': 1, 'color': 'pink', 'size': 6.0, 'double_size': 12.0},
+        {'fruit_id': 2, 'color': 'pink', 'size': 6.0, 'double_size': 12.0},
+        {'fruit_id': 3, 'color': 'pink', 'size': 6.0, 'double_size': 12.0},
+    ]
+
+    code, json = client.fetch(
+        '/api/fruit?tree_id=1', method="PATCH", json={'size': 30}
+    )
+    assert code == 500
+    assert json['message'] == 'Validation Error'
+
+    code, json = client.fetch(
+        '/api/fruit?tree_id=1', method="PATCH", json={'fruit_id': 3}
+    )
+    assert code == 400
+    assert json['message'] == 'Cannot patch primary keys in batch'
+
+
+def test_patch_fruits_refresh_computed(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(
+        Fruit,
+        methods=['GET', 'PATCH'],
+        only=['size', 'double_size'],
+        allow_batch=True,
+    )
+    with statements(client.engine) as executed:
+        code, json = client.fetch(
+            '/api/fruit',
+            method="PATCH",
+            json={
+                'objects': [
+                    {'fruit_id': 1, 'size': 4},
+                    {'fruit_id': 2, 'size': 5},
+                    {'fruit_id': 3, 'size': 6},
+                ]
+            },
+        )
+    assert code == 200
+    assert idsorted(json['objects'], 'fruit_id') == [
+        {'fruit_id': 1, 'size': 4.0, 'double_size': 8.0},
+        {'fruit_id': 2, 'size': 5.0, 'double_size': 10.0},
+        {'fruit_id': 3, 'size': 6.0, 'double_size': 12.0},
+    ]
+    selects = [s for s in executed if s.lstrip().startswith('SELECT')]
+    # Lookup and bulk refresh of double_size only
+    assert len(selects) == 2
+    assert 'fruit.hue' not in selects[1]
+
+
+def test_patch_fruits_refresh_deferred(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Fruit, methods=['GET', 'PATCH'], allow_batch=True)
+    with statements(client.engine) as executed:
+        code, json = client.fetch(
+            '/api/fruit',
+            method="PATCH",
+            json={
+                'objects': [
+                    {'fruit_id': 1, 'size': 4},
+                    {'fruit_id': 2, 'size': 5},
+                    {'fruit_id': 3, 'size': 6},
+                ]
+            },
+        )
+    assert code == 200
+    assert [
+        (fruit['fruit_id'], fruit['double_size'], fruit['age'])
+        for fruit in idsorted(json['objects'], 'fruit_id')
+    ] == [
+        (1, 8.0, timedelta(days=12, hours=1, minutes=15).total_seconds()),
+        (2, 10.0, timedelta(days=49, seconds=230.213).total_seconds()),
+        (3, 12.0, 0.0),
+    ]
+    selects = [s for s in executed if s.lstrip().startswith('SELECT')]
+    # Deferred age is loaded along with the lookup and the bulk refresh
+    assert len(selects) == 2
+    assert all('fruit.age' in select for select in selects)
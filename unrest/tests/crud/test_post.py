@@ -1,5 +1,5 @@
 from ...unrest import UnRest
-from .. import idsorted
+from .. import idsorted, statements
 from ..model import Fruit, Tree
 
 
@@ -43,6 +43,56 @@ def test_post_tree_null_value(client):
     ]
 
 
+def test_post_trees(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Tree, methods=['GET', 'POST'])
+    with statements(client.engine) as executed:
+        code, json = client.fetch(
+            '/api/tree',
+            method="POST",
+            json={
+                'objects': [
+                    {'name': 'cedar'},
+                    {'name': 'mango'},
+                    {'id': 12, 'name': 'palm'},
+                ]
+            },
+        )
+    assert code == 200
+    assert json['occurences'] == 3
+    assert json['objects'] == [
+        {'id': 4, 'name': 'cedar'},
+        {'id': 5, 'name': 'mango'},
+        {'id': 12, 'name': 'palm'},
+    ]
+    assert all(s.lstrip().startswith('INSERT') for s in executed)
+
+    code, json = client.fetch('/api/tree')
+    assert code == 200
+    assert json['occurences'] == 6
+
+
+def test_post_fruits_computed(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Fruit, methods=['GET', 'POST'], only=['size', 'double_size'])
+    code, json = client.fetch(
+        '/api/fruit',
+        method="POST",
+        json={
+            'objects': [
+                {'size': 1},
+                {'size': 2.5},
+            ]
+        },
+    )
+    assert code == 200
+    assert json['occurences'] == 2
+    assert json['objects'] == [
+        {'fruit_id': 6, 'size': 1.0, 'double_size': 2.0},
+        {'fruit_id': 7, 'size': 2.5, 'double_size': 5.0},
+    ]
+
+
 def test_post_empty_payload(client):
     rest = UnRest(client.app, client.session, framework=client.__framework__)
     rest(Tree, methods=['GET', 'POST'])
@@ -1,5 +1,5 @@
 from ...unrest import UnRest
-from .. import idsorted
+from .. import idsorted, statements
 from ..model import Fruit, Tree
 
 
@@ -46,6 +46,45 @@ def test_put_tree(client):
     ]
 
 
+def test_put_tree_diff(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Tree, methods=['GET', 'PUT'], allow_batch=True, batch_put='diff')
+    with statements(client.engine) as executed:
+        code, json = client.fetch(
+            '/api/tree',
+            method="PUT",
+            json={
+                'objects': [
+                    {'id': 1, 'name': 'pine'},
+                    {'id': 2, 'name': 'mango'},
+                    {'name': 'fig'},
+                ]
+            },
+        )
+    assert code == 200
+    assert json['occurences'] == 3
+    assert json['objects'] == [
+        {'id': 1, 'name': 'pine'},
+        {'id': 2, 'name': 'mango'},
+        {'id': 4, 'name': 'fig'},
+    ]
+    assert json['changes'] == {'inserted': 1, 'updated': 1, 'deleted': 1}
+    writes = [
+        statement.split()[0]
+        for statement in executed
+        if not statement.lstrip().startswith('SELECT')
+    ]
+    assert sorted(writes) == ['DELETE', 'INSERT', 'UPDATE']
+
+    code, json = client.fetch('/api/tree')
+    assert code == 200
+    assert idsorted(json['objects']) == [
+        {'id': 1, 'name': 'pine'},
+        {'id': 2, 'name': 'mango'},
+        {'id': 4, 'name': 'fig'},
+    ]
+
+
 def test_put_with_defaults(client):
     rest = UnRest(client.app, client.session, framework=client.__framework__)
     rest(
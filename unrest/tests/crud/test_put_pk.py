@@ -1,5 +1,8 @@
+from pytest import mark
+from sqlalchemy.dialects import postgresql, sqlite
+
 from ...unrest import UnRest
-from .. import idsorted
+from .. import idsorted, statements
 from ..model import Fruit, Tree
 
 
@@ -137,3 +140,132 @@ def test_put_fruit(client):
             'tree_id': None,
         },
     ]
+
+
+@mark.skipif(
+    hasattr(sqlite, 'insert'),
+    reason='SQLite upserts run with SQLAlchemy >= 1.4',
+)
+def test_put_tree_upsert_falls_back_on_sqlite(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    tree = rest(Tree, methods=['GET', 'PUT'], upsert=True)
+    assert not tree.can_upsert
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch(
+            '/api/tree/1', method="PUT", json={'name': 'cedar'}
+        )
+    assert code == 200
+    assert json['objects'] == [{'id': 1, 'name': 'cedar'}]
+    # The ORM lookup, update and reload
+    assert [statement.split()[0] for statement in executed] == [
+        'SELECT',
+        'UPDATE',
+        'SELECT',
+    ]
+
+    code, json = client.fetch(
+        '/api/tree/6', method="PUT", json={'name': 'fig'}
+    )
+    assert code == 200
+    assert json['objects'] == [{'id': 6, 'name': 'fig'}]
+
+    code, json = client.fetch('/api/tree')
+    assert code == 200
+    assert idsorted(json['objects']) == [
+        {'id': 1, 'name': 'cedar'},
+        {'id': 2, 'name': 'maple'},
+        {'id': 3, 'name': 'oak'},
+        {'id': 6, 'name': 'fig'},
+    ]
+
+
+@mark.skipif(
+    not hasattr(sqlite, 'insert'),
+    reason='SQLite upserts require SQLAlchemy >= 1.4',
+)
+def test_put_tree_upsert_runs_on_sqlite(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    tree = rest(Tree, methods=['GET', 'PUT'], upsert=True)
+    assert tree.can_upsert
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch(
+            '/api/tree/1', method="PUT", json={'name': 'cedar'}
+        )
+    assert code == 200
+    assert json['objects'] == [{'id': 1, 'name': 'cedar'}]
+    assert len(executed) == 2
+    assert executed[0].startswith('INSERT INTO tree')
+    assert 'ON CONFLICT (id) DO UPDATE' in executed[0]
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch(
+            '/api/tree/6', method="PUT", json={'name': 'fig'}
+        )
+    assert code == 200
+    assert json['objects'] == [{'id': 6, 'name': 'fig'}]
+    assert 'ON CONFLICT' in executed[0]
+
+    code, json = client.fetch('/api/tree')
+    assert idsorted(json['objects']) == [
+        {'id': 1, 'name': 'cedar'},
+        {'id': 2, 'name': 'maple'},
+        {'id': 3, 'name': 'oak'},
+        {'id': 6, 'name': 'fig'},
+    ]
+
+
+def test_put_tree_upsert_with_query_factory(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    tree = rest(Tree, methods=['GET', 'PUT'], upsert=True)
+    subtree = tree.sub(lambda q: q.filter(Tree.name != 'pine'))
+    filtered = rest(
+        Tree,
+        name='filtered',
+        upsert=True,
+        query=lambda q: q.filter(Tree.name != 'pine'),
+    )
+    # The upsert would write rows the endpoint query can't see
+    assert not subtree.can_upsert
+    assert not filtered.can_upsert
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch(
+            '/api/subtree/2', method="PUT", json={'name': 'cedar'}
+        )
+    assert code == 200
+    assert json['objects'] == [{'id': 2, 'name': 'cedar'}]
+    assert not any('ON CONFLICT' in statement for statement in executed)
+
+
+def test_put_fruit_upsert_statement(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    fruit = rest(Fruit, only=['color', 'double_size'], upsert=True)
+    statement = fruit.upsert_statement(
+        {'fruit_id': 2, 'color': 'cyan'}, 'postgresql'
+    ).compile(dialect=postgresql.dialect())
+    assert str(statement) == (
+        'INSERT INTO fruit (idf, hue) VALUES (%(idf)s, %(hue)s) '
+        'ON CONFLICT (idf) DO UPDATE SET hue = excluded.hue'
+    )
+    assert statement.params == {'idf': 2, 'hue': 'cyan'}
+
+
+def test_put_tree_upsert_with_validators(client):
+    def name_validator(field):
+        return field.value.upper()
+
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    tree = rest(
+        Tree,
+        methods=['GET', 'PUT'],
+        upsert=True,
+        validators={'name': name_validator},
+    )
+    assert not tree.can_upsert
+    code, json = client.fetch(
+        '/api/tree/2', method="PUT", json={'name': 'cedar'}
+    )
+    assert code == 200
+    assert json['objects'] == [{'id': 2, 'name': 'CEDAR'}]
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from ...unrest import UnRest
+from ...util import Request
+from .. import RoutesFramework, idsorted
+from ..model import Base, Fruit, Tree, fill_data
+
+pytest.importorskip('aiosqlite')
+sqlalchemy_asyncio = pytest.importorskip('sqlalchemy.ext.asyncio')
+
+
+def request(method, url, payload=None, headers={'Authorization': 'secret'}):
+    return Request(
+        url,
+        method,
+        {'id': None},
+        {},
+        payload and payload.encode('utf-8'),
+        headers,
+    )
+
+
+def test_async_session(tmp_path):
+    async def name_validator(field):
+        await asyncio.sleep(0)
+        return field.value.upper()
+
+    def auth(route):
+        async def auth_route(request, payload, **pks):
+            await asyncio.sleep(0)
+            if request.headers.get('Authorization') != 'secret':
+                raise UnRest.RestError(401, 'Unauthorized')
+            return await route(request, payload, **pks)
+
+        return auth_route
+
+    async def serve():
+        engine = sqlalchemy_asyncio.create_async_engine(
+            f"sqlite+aiosqlite:///{tmp_path / 'async.db'}"
+        )
+        async with engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        Session = sessionmaker(
+            engine, class_=sqlalchemy_asyncio.AsyncSession
+        )
+        async with Session() as session:
+            await session.run_sync(fill_data)
+
+        rest = UnRest(
+            object(),
+            framework=RoutesFramework,
+            session_factory=Session,
+        )
+        rest(
+            Tree,
+            methods=['GET', 'POST'],
+            relationships={
+                'fruits': rest(Fruit, only=['color', 'age'], deferred='member')
+            },
+            validators={'name': name_validator},
+            auth=auth,
+        )
+        routes = rest.framework.routes
+
+        get_trees = routes['/api/tree', 'GET']
+        assert rest.framework.is_async(get_trees)
+        response = await get_trees(request('GET', '/api/tree'))
+        assert response.status == 200
+        get = json.loads(response.payload)
+
+        response = await routes['/api/tree', 'POST'](
+            request('POST', '/api/tree', '{"name": "cedar"}')
+        )
+        assert response.status == 200
+        post = json.loads(response.payload)
+
+        response = await get_trees(request('GET', '/api/tree', headers={}))
+        assert response.status == 401
+
+        await engine.dispose()
+        return get, post
+
+    get, post = asyncio.run(serve())
+    assert get['occurences'] == 3
+    pine = idsorted(get['objects'])[0]
+    assert pine['name'] == 'pine'
+    assert [fruit['color'] for fruit in pine['fruits']] == [
+        'grey',
+        'darkgrey',
+        'brown',
+    ]
+    assert post['objects'] == [{'id': 4, 'name': 'CEDAR', 'fruits': []}]
@@ -0,0 +1,182 @@
+import json as jsonlib
+from asyncio import gather, run
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import ContextVar, copy_context
+from threading import Barrier, current_thread
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from ...framework import AsyncFramework
+from ...idiom.unrest import UnRestIdiom
+from ...unrest import UnRest
+from ...util import Request
+from .. import RoutesFramework
+from ..model import Base, Fruit, Tree, fill_data
+
+
+def test_concurrent_requests_are_isolated(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'concurrency.db'}")
+    Base.metadata.create_all(engine)
+    session = scoped_session(sessionmaker(bind=engine))
+    fill_data(session)
+    session.remove()
+
+    colors = ['grey', 'darkgrey', 'brown', 'red', 'orangered'] * 4
+    barrier = Barrier(len(colors), timeout=10)
+    variables = set()
+
+    class ColorIdiom(UnRestIdiom):
+        def request_fields(self, request):
+            variables.update(
+                variable.name
+                for variable in copy_context()
+                if variable.name.startswith('unrest')
+            )
+            # All requests are in their scope before any builds its query
+            barrier.wait()
+            return super().request_fields(request)
+
+        def alter_query(self, request, query):
+            return query.filter(Fruit.color == request.query['color'][0])
+
+    rest = UnRest(
+        object(), session, framework=RoutesFramework, idiom=ColorIdiom
+    )
+    fruit = rest(Fruit, only=['color'])
+    rest(Tree)
+    route = rest.framework.routes['/api/fruit', 'GET']
+
+    def get(color):
+        try:
+            response = route(
+                Request(
+                    '/api/fruit',
+                    'GET',
+                    {'fruit_id': None},
+                    {'color': [color]},
+                    b'',
+                    {},
+                )
+            )
+            return jsonlib.loads(response.payload)
+        finally:
+            session.remove()
+
+    with ThreadPoolExecutor(len(colors)) as executor:
+        results = list(executor.map(get, colors))
+
+    for color, result in zip(colors, results):
+        assert result['occurences'] == 1
+        assert [fruit['color'] for fruit in result['objects']] == [color]
+    assert fruit.request_scope is None
+    # Endpoints share one context variable
+    assert variables == {'unrest_scopes'}
+
+
+def test_async_framework_runs_in_executor():
+    class PoolFramework(AsyncFramework):
+        __max_workers__ = 4
+
+    framework = PoolFramework(object(), '/api')
+    barrier = Barrier(4, timeout=10)
+    user = ContextVar('user')
+
+    def route(request):
+        # Blocks unless the 4 routes run at the same time
+        barrier.wait()
+        return request, user.get(), current_thread().name
+
+    async def serve():
+        user.set('admin')
+        return await gather(
+            *(framework.run_in_executor(route, i) for i in range(4))
+        )
+
+    results = run(serve())
+    assert [request for request, _, _ in results] == [0, 1, 2, 3]
+    assert all(name == 'admin' for _, name, _ in results)
+    assert all(thread.startswith('unrest') for _, _, thread in results)
+    assert framework.executor._max_workers == 4
+    framework.executor.shutdown()
+
+
+def test_async_framework_closes_executor_sessions(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'executor.db'}",
+        connect_args={'check_same_thread': False},
+    )
+    Base.metadata.create_all(engine)
+    session = scoped_session(sessionmaker(bind=engine))
+    fill_data(session)
+    session.remove()
+
+    class AsyncRoutesFramework(RoutesFramework, AsyncFramework):
+        __max_workers__ = 1
+
+    def get_fruits(close_session=None):
+        rest = UnRest(
+            object(),
+            session,
+            framework=AsyncRoutesFramework,
+            close_session=close_session,
+        )
+        rest(Fruit)
+        framework = rest.framework
+        route = framework.routes['/api/fruit', 'GET']
+        request = Request('/api/fruit', 'GET', {}, {}, b'', {})
+        response = run(framework.call(route, request))
+        assert jsonlib.loads(response.payload)['occurences'] == 5
+        try:
+            return framework.executor.submit(session.registry.has).result()
+        finally:
+            framework.executor.submit(session.remove).result()
+            framework.executor.shutdown()
+
+    # The executor thread session is removed at the end of the request
+    assert get_fruits() is False
+    assert get_fruits(close_session=False) is True
+
+
+def test_async_framework_serializes_shared_session(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'shared.db'}",
+        connect_args={'check_same_thread': False},
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    fill_data(session)
+    session.close()
+
+    class AsyncRoutesFramework(RoutesFramework, AsyncFramework):
+        pass
+
+    rest = UnRest(object(), session, framework=AsyncRoutesFramework)
+    rest(Tree)
+    framework = rest.framework
+    route = framework.routes['/api/tree', 'GET']
+
+    async def serve():
+        return await gather(
+            *(
+                framework.call(
+                    route, Request('/api/tree', 'GET', {}, {}, b'', {})
+                )
+                for _ in range(200)
+            )
+        )
+
+    try:
+        responses = run(serve())
+    finally:
+        framework.executor.shutdown()
+        framework.serial_executor.shutdown()
+    assert all(
+        jsonlib.loads(response.payload)['occurences'] == 3
+        for response in responses
+    )
+    # All the requests ran one at a time in the same thread
+    assert len(framework.serial_executor._threads) == 1
+    assert not framework.executor._threads
+    # And the shared session is left open
+    assert session.query(Tree).count() == 3
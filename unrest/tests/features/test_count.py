@@ -0,0 +1,102 @@
+import json as jsonlib
+
+from ...idiom.json_server import JsonServerIdiom
+from ...unrest import UnRest
+from .. import idsorted, statements
+from ..model import Fruit, Tree
+
+
+def test_count_exact_without_order(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Fruit, only=['color'], query=lambda q: q.order_by(Fruit.color))
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch('/api/fruit')
+    assert code == 200
+    assert json['occurences'] == 5
+    assert 'count' not in json
+    count = next(s for s in executed if 'count(' in s)
+    assert 'ORDER BY' not in count
+
+
+def test_count_window(client):
+    rest = UnRest(
+        client.app,
+        client.session,
+        idiom=JsonServerIdiom,
+        framework=client.__framework__,
+    )
+    rest(Fruit, only=['color'], count='window')
+
+    with statements(client.engine) as executed:
+        response = client.raw_fetch('/api/fruit?_page=2&_limit=2')
+    assert response.code == 200
+    assert int(response.headers['X-Total-Count']) == 5
+    assert idsorted(jsonlib.loads(response.body), 'fruit_id') == [
+        {'fruit_id': 3, 'color': 'brown'},
+        {'fruit_id': 4, 'color': 'red'},
+    ]
+    assert len(executed) == 1
+
+    response = client.raw_fetch('/api/fruit?_page=5&_limit=2')
+    assert response.code == 200
+    assert int(response.headers['X-Total-Count']) == 5
+    assert jsonlib.loads(response.body) == []
+
+
+def test_count_window_joined(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(
+        Tree,
+        relationships={'fruits': rest(Fruit, only=['color'])},
+        relationship_loading={'fruits': 'joined'},
+        count='window',
+    )
+
+    code, json = client.fetch('/api/tree')
+    assert code == 200
+    assert len(json['objects']) == 3
+    # The joined fruit rows are not counted
+    assert json['occurences'] == 3
+    assert 'count' not in json
+
+
+def test_count_capped(client):
+    rest = UnRest(
+        client.app,
+        client.session,
+        idiom=JsonServerIdiom,
+        framework=client.__framework__,
+    )
+    rest(Fruit, only=['color'], count=3)
+    response = client.raw_fetch('/api/fruit')
+    assert response.code == 200
+    assert response.headers['X-Total-Count'] == '3+'
+
+    rest(Fruit, only=['color'], count=10, name='fruits')
+    response = client.raw_fetch('/api/fruits')
+    assert response.code == 200
+    assert response.headers['X-Total-Count'] == '5'
+
+
+def test_count_none(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Fruit, only=['color'], count='none')
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch('/api/fruit')
+    assert code == 200
+    assert 'occurences' not in json
+    assert json['count'] == 'none'
+    assert len(json['objects']) == 5
+    assert len(executed) == 1
+
+
+def test_count_estimate_fallback(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Fruit, only=['color'], count='estimate')
+
+    code, json = client.fetch('/api/fruit')
+    assert code == 200
+    assert json['occurences'] == 5
+    assert 'count' not in json
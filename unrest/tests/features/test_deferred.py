@@ -0,0 +1,67 @@
+from ...unrest import UnRest
+from .. import idsorted, statements
+from ..model import Fruit, Tree
+
+
+def test_get_fruits_undefer(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Fruit, only=['age'])
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch('/api/fruit')
+    assert code == 200
+    assert json['occurences'] == 5
+    assert idsorted(json['objects'], 'fruit_id') == [
+        {'fruit_id': 1, 'age': 1_041_300.0},
+        {'fruit_id': 2, 'age': 4_233_830.213},
+        {'fruit_id': 3, 'age': 0.0},
+        {'fruit_id': 4, 'age': 2400.0},
+        {'fruit_id': 5, 'age': 7200.000012},
+    ]
+    # Count and fruits with their age
+    assert len(executed) == 2
+
+
+def test_get_fruits_deferred_member(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Fruit, only=['color', 'age'], deferred='member')
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch('/api/fruit')
+    assert code == 200
+    assert json['occurences'] == 5
+    assert idsorted(json['objects'], 'fruit_id') == [
+        {'fruit_id': 1, 'color': 'grey'},
+        {'fruit_id': 2, 'color': 'darkgrey'},
+        {'fruit_id': 3, 'color': 'brown'},
+        {'fruit_id': 4, 'color': 'red'},
+        {'fruit_id': 5, 'color': 'orangered'},
+    ]
+    assert len(executed) == 2
+    assert all('age' not in statement for statement in executed)
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch('/api/fruit/4')
+    assert code == 200
+    assert json['objects'] == [
+        {'fruit_id': 4, 'color': 'red', 'age': 2400.0}
+    ]
+    assert len(executed) == 1
+
+
+def test_get_tree_with_deferred_relationship(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    fruit = rest.virtual(Fruit, only=['age'], deferred='member')
+    rest(Tree, relationships={'fruits': fruit})
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch('/api/tree')
+    assert code == 200
+    assert json['occurences'] == 3
+    assert idsorted(json['objects'])[1] == {
+        'id': 2,
+        'name': 'maple',
+        'fruits': [{'fruit_id': 4, 'age': 2400.0}],
+    }
+    # Count, trees and all their fruits with their age
+    assert len(executed) == 3
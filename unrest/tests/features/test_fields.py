@@ -0,0 +1,124 @@
+from sqlalchemy.types import Float, Numeric
+
+from ...idiom.json_server import JsonServerIdiom
+from ...unrest import UnRest
+from .. import idsorted, statements
+from ..model import Fruit, Tree
+
+
+def test_get_fruits_fields(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Fruit)
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch('/api/fruit?fields=color')
+    assert code == 200
+    assert json['occurences'] == 5
+    assert idsorted(json['objects'], 'fruit_id') == [
+        {'fruit_id': 1, 'color': 'grey'},
+        {'fruit_id': 2, 'color': 'darkgrey'},
+        {'fruit_id': 3, 'color': 'brown'},
+        {'fruit_id': 4, 'color': 'red'},
+        {'fruit_id': 5, 'color': 'orangered'},
+    ]
+    select = executed[-1]
+    assert 'fruit.hue' in select
+    assert 'fruit.size' not in select
+    assert 'fruit.age' not in select
+
+
+def test_get_fruit_fields(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Fruit)
+
+    code, json = client.fetch('/api/fruit/2?fields=age,double_size')
+    assert code == 200
+    assert json['objects'] == [
+        {'fruit_id': 2, 'age': 4_233_830.213, 'double_size': 46.0}
+    ]
+
+
+def test_get_fruits_unknown_fields(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Fruit, only=['color'])
+
+    code, json = client.fetch('/api/fruit?fields=color,size,flavor')
+    assert code == 400
+    assert json['message'] == 'Unknown fields: size, flavor'
+
+
+def test_get_fruits_fields_with_property(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Fruit, properties=[rest.Property('square_size', Float())])
+
+    code, json = client.fetch('/api/fruit/4?fields=square_size')
+    assert code == 200
+    assert json['objects'] == [{'fruit_id': 4, 'square_size': 0.25}]
+
+
+def test_get_fruits_fields_with_property_primary_key(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(
+        Fruit,
+        primary_keys=['square_size'],
+        properties=[rest.Property('square_size', Numeric())],
+    )
+
+    code, json = client.fetch('/api/fruit?fields=color')
+    assert code == 200
+    assert idsorted(json['objects'], 'square_size') == [
+        {'square_size': 0.25, 'color': 'red'},
+        {'square_size': 4.4944, 'color': 'brown'},
+        {'square_size': 144.0, 'color': 'grey'},
+        {'square_size': 529.0, 'color': 'darkgrey'},
+        {'square_size': 10000.0, 'color': 'orangered'},
+    ]
+
+
+def test_get_trees_fields_with_relationship(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    tree = rest.virtual(Tree)
+    fruit = rest.virtual(Fruit, only=['color'], relationships={'tree': tree})
+    rest(Tree, relationships={'fruits': fruit})
+    rest(Fruit, relationships={'tree': tree})
+
+    code, json = client.fetch('/api/tree?fields=fruits')
+    assert code == 200
+    assert idsorted(json['objects'])[1] == {
+        'id': 2,
+        'fruits': [
+            {
+                'fruit_id': 4,
+                'color': 'red',
+                'tree': [{'id': 2, 'name': 'maple'}],
+            }
+        ],
+    }
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch('/api/fruit?fields=tree')
+    assert code == 200
+    assert idsorted(json['objects'], 'fruit_id')[3:] == [
+        {'fruit_id': 4, 'tree': [{'id': 2, 'name': 'maple'}]},
+        {'fruit_id': 5, 'tree': []},
+    ]
+    # Count, fruits and their trees
+    assert len(executed) == 3
+
+
+def test_json_server_fields(client):
+    rest = UnRest(
+        client.app,
+        client.session,
+        idiom=JsonServerIdiom,
+        framework=client.__framework__,
+    )
+    rest(Fruit)
+
+    code, json = client.fetch('/api/fruit?fields=size&color=red')
+    assert code == 200
+    assert json == [{'fruit_id': 4, 'size': 0.5}]
+
+    code, json = client.fetch('/api/fruit?fields=flavor')
+    assert code == 400
+    assert json == {'message': 'Unknown fields: flavor'}
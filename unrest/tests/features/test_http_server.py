@@ -0,0 +1,95 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler
+from threading import Thread
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import scoped_session, sessionmaker
+
+from ...framework.http_server import HTTPServerFramework, ThreadPoolHTTPServer
+from ...unrest import UnRest
+from ..model import Base, Fruit, Tree, fill_data
+
+
+class AppHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = b'A normal route!'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_thread_pool_http_server(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'http_server.db'}",
+        connect_args={'check_same_thread': False},
+    )
+    Base.metadata.create_all(engine)
+    session = scoped_session(sessionmaker(bind=engine))
+    fill_data(session)
+    session.remove()
+
+    server = ThreadPoolHTTPServer(
+        ('localhost', 0), AppHandler, max_workers=4, keep_alive_timeout=1
+    )
+    rest = UnRest(
+        server,
+        session,
+        close_session=True,
+        framework=HTTPServerFramework,
+    )
+    rest(Tree, methods=['GET', 'PUT'])
+    rest(Fruit)
+    thread = Thread(target=server.serve_forever)
+    thread.start()
+
+    def fetch(connection, method, url, body=None):
+        connection.request(method, url, body)
+        response = connection.getresponse()
+        payload = response.read()
+        assert response.getheader('Content-Length') == str(len(payload))
+        return response.status, payload
+
+    try:
+        connection = HTTPConnection(*server.server_address, timeout=10)
+        status, payload = fetch(connection, 'GET', '/api/tree')
+        assert status == 200
+        assert json.loads(payload)['occurences'] == 3
+        sock = connection.sock
+
+        # The connection is kept alive through bodies and errors
+        status, _ = fetch(connection, 'DELETE', '/api/tree/1', '{"a": 1}')
+        assert status == 405
+        status, _ = fetch(
+            connection, 'PUT', '/api/tree/1', '{"name": "cedar"}'
+        )
+        assert status == 200
+        status, payload = fetch(connection, 'GET', '/api/tree/1')
+        assert json.loads(payload)['objects'][0]['name'] == 'cedar'
+        assert fetch(connection, 'GET', '/') == (200, b'A normal route!')
+        assert connection.sock is sock
+        connection.close()
+
+        def client(i):
+            connection = HTTPConnection(*server.server_address, timeout=10)
+            statuses = [
+                fetch(connection, 'GET', f'/api/fruit/{i % 5 + 1}')[0]
+                for _ in range(5)
+            ]
+            connection.close()
+            return statuses
+
+        with ThreadPoolExecutor(8) as executor:
+            assert all(
+                statuses == [200] * 5
+                for statuses in executor.map(client, range(16))
+            )
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join()
@@ -295,6 +295,21 @@ def test_json_server_post_tree(client):
     ]
 
 
+def test_json_server_post_trees(client):
+    rest = UnRest(
+        client.app,
+        client.session,
+        idiom=JsonServerIdiom,
+        framework=client.__framework__,
+    )
+    rest(Tree, methods=['GET', 'POST'])
+    code, json = client.fetch(
+        '/api/tree', method="POST", json=[{'name': 'cedar'}, {'name': 'fig'}]
+    )
+    assert code == 200
+    assert json == [{'id': 4, 'name': 'cedar'}, {'id': 5, 'name': 'fig'}]
+
+
 def test_json_server_put_tree(client):
     rest = UnRest(
         client.app,
@@ -545,3 +545,27 @@ def test_duplicate_rest(client):
 
     with raises(Exception):
         rest(Tree)
+
+
+def test_plan_is_cached(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    fruit = rest(Fruit, only=['color'], primary_keys=['fruit_id', 'color'])
+
+    plan = fruit.plan
+    assert fruit.plan is plan
+    assert fruit.primary_keys == ('fruit_id', 'color')
+    assert list(fruit.columns) == ['fruit_id', 'color']
+    assert fruit.parameters_to_pks({'fruit_id': '2', 'color': 'red'}) == {
+        'fruit_id': 2,
+        'color': 'red',
+    }
+
+    @fruit.declare('GET')
+    def get(payload, fruit_id=None, color=None):
+        return fruit.get(payload, fruit_id=fruit_id, color=color)
+
+    assert fruit.plan is not plan
+
+    code, json = client.fetch('/api/fruit/4/red')
+    assert code == 200
+    assert json['objects'] == [{'fruit_id': 4, 'color': 'red'}]
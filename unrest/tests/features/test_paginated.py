@@ -1,7 +1,13 @@
+import json as jsonlib
+
+from pytest import raises
+from sqlalchemy.types import Float, String
+
+from ...idiom.json_server import JsonServerIdiom
 from ...idiom.unrest import UnRestIdiom
 from ...unrest import UnRest
 from .. import idsorted
-from ..model import Tree
+from ..model import Fruit, Tree
 
 
 def test_paginated(client):
@@ -52,3 +58,140 @@ def test_paginated(client):
     assert json['offset'] == 3
     assert json['primary_keys'] == ['id']
     assert idsorted(json['objects']) == []
+
+
+def test_cursor_paginated(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Fruit, only=['color'], cursor_pagination=2)
+
+    code, json = client.fetch('/api/fruit')
+    assert code == 200
+    assert json['occurences'] == 5
+    assert json['limit'] == 2
+    assert json['objects'] == [
+        {'fruit_id': 1, 'color': 'grey'},
+        {'fruit_id': 2, 'color': 'darkgrey'},
+    ]
+    code, json = client.fetch(f'/api/fruit?cursor={json["next"]}')
+    assert code == 200
+    assert json['occurences'] == 5
+    assert json['objects'] == [
+        {'fruit_id': 3, 'color': 'brown'},
+        {'fruit_id': 4, 'color': 'red'},
+    ]
+    code, json = client.fetch(f'/api/fruit?cursor={json["next"]}&limit=3')
+    assert code == 200
+    assert json['limit'] == 3
+    assert json['objects'] == [{'fruit_id': 5, 'color': 'orangered'}]
+    assert 'next' not in json
+
+    code, json = client.fetch('/api/fruit?cursor=nope')
+    assert code == 400
+    assert json['message'] == 'Invalid cursor nope'
+
+    code, json = client.fetch('/api/fruit?limit=abc')
+    assert code == 400
+    assert json['message'] == 'Invalid limit abc'
+
+    code, json = client.fetch('/api/fruit?limit=0')
+    assert code == 400
+    assert json['message'] == 'Invalid limit 0'
+
+
+def test_cursor_paginated_composite_keys(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Tree, primary_keys=['name', 'id'], cursor_pagination=1)
+
+    objects = []
+    code, json = client.fetch('/api/tree')
+    while True:
+        assert code == 200
+        assert json['occurences'] == 3
+        objects.extend(json['objects'])
+        if 'next' not in json:
+            break
+        code, json = client.fetch(f'/api/tree?cursor={json["next"]}')
+    assert objects == [
+        {'id': 2, 'name': 'maple'},
+        {'id': 3, 'name': 'oak'},
+        {'id': 1, 'name': 'pine'},
+    ]
+
+
+def test_cursor_paginated_json_server(client):
+    rest = UnRest(
+        client.app,
+        client.session,
+        idiom=JsonServerIdiom,
+        framework=client.__framework__,
+    )
+    rest(Fruit, only=['color', 'size'], cursor_pagination=10)
+
+    objects = []
+    cursor = ''
+    while cursor is not None:
+        response = client.raw_fetch(
+            f'/api/fruit?_sort=size,color&_order=desc,asc&_limit=2{cursor}'
+        )
+        assert response.code == 200
+        assert int(response.headers['X-Total-Count']) == 5
+        objects.extend(jsonlib.loads(response.body.decode('utf-8')))
+        next = response.headers.get('X-Next-Cursor')
+        cursor = f'&_cursor={next}' if next else None
+    assert [fruit['fruit_id'] for fruit in objects] == [5, 2, 1, 3, 4]
+
+    code, json = client.fetch('/api/fruit?_sort=tree.name')
+    assert code == 400
+    assert json == {'message': 'Cannot paginate on tree.name'}
+
+    code, json = client.fetch('/api/fruit?_limit=abc')
+    assert code == 400
+    assert json == {'message': 'Invalid limit abc'}
+
+
+def test_cursor_paginated_computed_property(client):
+    rest = UnRest(
+        client.app,
+        client.session,
+        idiom=JsonServerIdiom,
+        framework=client.__framework__,
+    )
+    rest(
+        Fruit,
+        only=['color'],
+        properties=[rest.Property('square_size', Float())],
+        cursor_pagination=2,
+    )
+
+    objects = []
+    cursor = ''
+    while cursor is not None:
+        response = client.raw_fetch(f'/api/fruit?_sort=square_size{cursor}')
+        assert response.code == 200
+        objects.extend(jsonlib.loads(response.body.decode('utf-8')))
+        next = response.headers.get('X-Next-Cursor')
+        cursor = f'&_cursor={next}' if next else None
+    # The computed 2.12 * 2.12 is compared as the database computes it
+    assert [fruit['fruit_id'] for fruit in objects] == [4, 3, 1, 2, 5]
+
+
+def test_cursor_paginated_python_property(client):
+    rest = UnRest(
+        client.app,
+        client.session,
+        idiom=JsonServerIdiom,
+        framework=client.__framework__,
+    )
+    tree = rest(
+        Tree,
+        properties=[rest.Property('fruit_colors', String())],
+        cursor_pagination=2,
+    )
+    code, json = client.fetch('/api/tree?_sort=fruit_colors')
+    assert code == 400
+    assert json == {'message': 'Cannot sort on fruit_colors'}
+
+    with raises(UnRest.RestError) as error:
+        tree.keyset([('fruit_colors', False)])
+    assert error.value.status == 400
+    assert error.value.message == 'Cannot paginate on fruit_colors'
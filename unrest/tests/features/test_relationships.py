@@ -1,5 +1,5 @@
 from ...unrest import UnRest
-from .. import idsorted
+from .. import idsorted, statements
 from ..model import Fruit, Tree
 
 
@@ -97,3 +97,68 @@ def test_virtual_enforce_no_methods_kwargs(client):
     rest(Tree, relationships={'fruits': rest.virtual(Fruit, methods=rest.all)})
     code, json = client.fetch('/api/fruit')
     assert code == 404
+
+
+def test_get_tree_with_relationship_is_eager(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    fruit = rest(Fruit, methods=[], only=['color'])
+    rest(Tree, relationships={'fruits': fruit})
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch('/api/tree')
+    assert code == 200
+    assert json['occurences'] == 3
+    assert len(json['objects'][0]['fruits']) == 3
+    # Count, trees and all their fruits
+    assert len(executed) == 3
+
+
+def test_get_tree_with_nested_relationships_is_eager(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    tree = rest.virtual(Tree, only=['name'])
+    fruit = rest.virtual(Fruit, only=['color'], relationships={'tree': tree})
+    rest(
+        Tree,
+        relationships={'fruits': fruit},
+        relationship_loading={'fruits': 'joined'},
+    )
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch('/api/tree/1')
+    assert code == 200
+    assert json['objects'] == [
+        {
+            'id': 1,
+            'name': 'pine',
+            'fruits': [
+                {
+                    'fruit_id': fruit_id,
+                    'color': color,
+                    'tree': [{'id': 1, 'name': 'pine'}],
+                }
+                for fruit_id, color in (
+                    (1, 'grey'),
+                    (2, 'darkgrey'),
+                    (3, 'brown'),
+                )
+            ],
+        }
+    ]
+    # Tree joined with its fruits, then the fruits trees
+    assert len(executed) == 2
+
+
+def test_get_tree_with_lazy_relationship(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    fruit = rest(Fruit, methods=[], only=['color'])
+    rest(
+        Tree,
+        relationships={'fruits': fruit},
+        relationship_loading={'fruits': 'lazy'},
+    )
+
+    with statements(client.engine) as executed:
+        code, json = client.fetch('/api/tree')
+    assert code == 200
+    assert json['occurences'] == 3
+    assert len(executed) == 5
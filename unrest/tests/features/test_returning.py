@@ -0,0 +1,125 @@
+import json as jsonlib
+
+from ...unrest import UnRest
+from .. import idsorted, statements
+from ..model import Fruit, Tree
+
+
+def test_post_tree_return_minimal(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Tree, methods=['GET', 'POST'])
+    with statements(client.engine) as executed:
+        response = client.raw_fetch(
+            '/api/tree',
+            method='POST',
+            headers={'Prefer': 'return=minimal'},
+            body=jsonlib.dumps({'name': 'cedar'}),
+        )
+    assert response.code == 200
+    assert response.headers['Preference-Applied'] == 'return=minimal'
+    assert jsonlib.loads(response.body) == {
+        'primary_keys': ['id'],
+        'occurences': 1,
+        'objects': [{'id': 4}],
+    }
+    assert [statement.split()[0] for statement in executed] == ['INSERT']
+
+
+def test_patch_fruits_returning_minimal(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(
+        Fruit,
+        methods=['GET', 'PATCH'],
+        allow_batch=True,
+        returning='minimal',
+    )
+    with statements(client.engine) as executed:
+        code, json = client.fetch(
+            '/api/fruit',
+            method="PATCH",
+            json={
+                'objects': [
+                    {'fruit_id': 1, 'color': 'blue'},
+                    {'fruit_id': 4, 'color': 'rainbow'},
+                ]
+            },
+        )
+    assert code == 200
+    assert json == {
+        'primary_keys': ['fruit_id'],
+        'occurences': 2,
+        'objects': [{'fruit_id': 1}, {'fruit_id': 4}],
+    }
+    # Lookup and update
+    assert len(executed) == 2
+
+    response = client.raw_fetch(
+        '/api/fruit/4',
+        method='PATCH',
+        headers={'Prefer': 'return=representation'},
+        body=jsonlib.dumps({'size': 3}),
+    )
+    assert response.code == 200
+    assert response.headers['Preference-Applied'] == 'return=representation'
+    assert jsonlib.loads(response.body)['objects'] == [
+        {
+            'fruit_id': 4,
+            'color': 'rainbow',
+            'size': 3.0,
+            'double_size': 6.0,
+            'age': 2400.0,
+            'tree_id': 2,
+        }
+    ]
+
+
+def test_delete_trees_returning_minimal(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(
+        Tree,
+        methods=['GET', 'DELETE'],
+        allow_batch=True,
+        returning='minimal',
+    )
+    with statements(client.engine) as executed:
+        code, json = client.fetch('/api/tree', method="DELETE")
+    assert code == 200
+    assert json['occurences'] == 3
+    assert idsorted(json['objects']) == [{'id': 1}, {'id': 2}, {'id': 3}]
+    assert executed[0].startswith('SELECT tree.id AS tree_id \nFROM tree')
+    assert len(executed) == 2
+
+    code, json = client.fetch('/api/tree')
+    assert code == 200
+    assert json['occurences'] == 0
+
+
+def test_delete_fruits_filtered_preference_applied(client):
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(
+        Fruit,
+        methods=['GET', 'DELETE', 'PATCH'],
+        allow_batch=True,
+        filter_batch=True,
+    )
+    response = client.raw_fetch(
+        '/api/fruit',
+        method='PATCH',
+        headers={'Prefer': 'return=representation'},
+        body=jsonlib.dumps({'color': 'pink'}),
+    )
+    assert response.code == 200
+    assert 'Preference-Applied' not in response.headers
+    assert jsonlib.loads(response.body) == {
+        'primary_keys': ['fruit_id'],
+        'occurences': 5,
+    }
+
+    response = client.raw_fetch(
+        '/api/fruit',
+        method='DELETE',
+        headers={'Prefer': 'return=minimal'},
+    )
+    assert response.code == 200
+    assert response.headers['Preference-Applied'] == 'return=minimal'
+    assert jsonlib.loads(response.body)['occurences'] == 5
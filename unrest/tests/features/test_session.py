@@ -0,0 +1,123 @@
+from sqlalchemy import event
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import Session, sessionmaker
+
+from ...unrest import UnRest
+from .. import idsorted
+from ..model import Tree
+
+
+class TrackedSession(Session):
+    sessions = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.closed = False
+        self.sessions.append(self)
+
+    def close(self):
+        self.closed = True
+        self.closed_identities = len(self.identity_map)
+        super().close()
+
+
+def test_session_factory(client):
+    TrackedSession.sessions.clear()
+    rest = UnRest(
+        client.app,
+        framework=client.__framework__,
+        session_factory=sessionmaker(
+            bind=client.engine, class_=TrackedSession
+        ),
+    )
+    tree = rest(Tree, methods=['GET', 'POST'])
+    code, json = client.fetch('/api/tree')
+    assert code == 200
+    assert json['occurences'] == 3
+    assert len(TrackedSession.sessions) == 1
+    [session] = TrackedSession.sessions
+    assert session.closed
+    assert len(session.identity_map) == 0
+    assert tree.session is None
+
+    code, json = client.fetch(
+        '/api/tree', method="POST", json={'name': 'cedar'}
+    )
+    assert code == 200
+    assert json['objects'] == [{'id': 4, 'name': 'cedar'}]
+    assert len(TrackedSession.sessions) == 2
+    assert all(session.closed for session in TrackedSession.sessions)
+
+    code, json = client.fetch('/api/tree')
+    assert code == 200
+    assert json['occurences'] == 4
+
+
+def test_session_rollback_on_error(client):
+    def name_validator(field):
+        raise field.ValidationError('Nope')
+
+    rest = UnRest(
+        client.app,
+        client.session,
+        framework=client.__framework__,
+        close_session=True,
+    )
+    rest(Tree, methods=['GET', 'POST'], validators={'name': name_validator})
+    code, json = client.fetch(
+        '/api/tree', method="POST", json={'name': 'cedar'}
+    )
+    assert code == 500
+    assert not client.session.registry.has()
+
+    code, json = client.fetch('/api/tree')
+    assert code == 200
+    assert json['occurences'] == 3
+
+
+def test_session_expunge(client):
+    TrackedSession.sessions.clear()
+    rest = UnRest(
+        client.app,
+        framework=client.__framework__,
+        session_factory=sessionmaker(
+            bind=client.engine, class_=TrackedSession
+        ),
+        expunge=True,
+    )
+    rest(Tree)
+    # Keep the loaded instances alive in the weak identity map
+    loaded = []
+
+    def on_load(tree, context):
+        loaded.append(tree)
+
+    event.listen(Tree, 'load', on_load)
+    try:
+        code, json = client.fetch('/api/tree')
+    finally:
+        event.remove(Tree, 'load', on_load)
+    assert code == 200
+    assert idsorted(json['objects']) == [
+        {'id': 1, 'name': 'pine'},
+        {'id': 2, 'name': 'maple'},
+        {'id': 3, 'name': 'oak'},
+    ]
+    assert len(loaded) == 3
+    [session] = TrackedSession.sessions
+    assert session.closed_identities == 0
+    assert all(inspect(tree).detached for tree in loaded)
+
+
+def test_session_set(client):
+    rest = UnRest(
+        client.app,
+        sessionmaker(bind=client.engine)(),
+        framework=client.__framework__,
+    )
+    rest(Tree)
+    rest.session = client.session
+    assert rest.session is client.session
+    code, json = client.fetch('/api/tree')
+    assert code == 200
+    assert json['occurences'] == 3
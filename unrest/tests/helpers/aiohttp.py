@@ -0,0 +1,68 @@
+import asyncio
+
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+from ...framework.aiohttp import AiohttpFramework
+from .unrest_client import UnRestClient
+
+
+class AiohttpClient(UnRestClient):
+    __framework__ = AiohttpFramework
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.http_client = None
+        self.routes = []
+        self.get_app()
+        super().setUp()
+
+    def get_app(self):
+        async def home(request):
+            return web.Response(text='A normal route!')
+
+        self.app = web.Application()
+        self.app.router.add_get('/', home)
+        self.app.session = self.session
+        return self.app
+
+    async def after_request(self, request, response):
+        self.session.remove()
+
+    async def serve(self):
+        # A started aiohttp application is frozen, serve a copy of its
+        # routes instead so that tests can register rests between fetches
+        routes = list(self.app.router.routes())
+        if routes == self.routes:
+            return
+        if self.http_client is not None:
+            await self.http_client.close()
+        app = web.Application()
+        for route in routes:
+            app.router.add_route(
+                route.method, route.resource.canonical, route.handler
+            )
+        app.on_response_prepare.append(self.after_request)
+        self.routes = routes
+        self.http_client = TestClient(TestServer(app))
+        await self.http_client.start_server()
+
+    async def request(self, url, method, headers, body):
+        await self.serve()
+        response = await self.http_client.request(
+            method, url, headers=headers, data=body
+        )
+        response.code = response.status
+        response.body = await response.read()
+        return response
+
+    def raw_fetch(self, url, method='GET', headers={}, body=None):
+        return self.loop.run_until_complete(
+            self.request(url, method, headers, body)
+        )
+
+    def tearDown(self):
+        if self.http_client is not None:
+            self.loop.run_until_complete(self.http_client.close())
+        self.loop.close()
+        super().tearDown()
@@ -0,0 +1,108 @@
+import asyncio
+from urllib.parse import urlsplit
+
+from ...framework.asgi import AsgiFramework
+from .http_server import FakeResponse
+from .unrest_client import UnRestClient
+
+
+class FakeApp(object):
+    """
+    The client app: the unrest frameworks created on it are chained, each
+    one falling back on the previous one and the first on `home`.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.asgi = self.home
+
+    async def home(self, scope, receive, send):
+        status, body = (
+            (200, b'A normal route!') if scope['path'] == '/' else (404, b'')
+        )
+        await send(
+            {'type': 'http.response.start', 'status': status, 'headers': []}
+        )
+        await send({'type': 'http.response.body', 'body': body})
+
+
+class ChainedAsgiFramework(AsgiFramework):
+    __chunk_size__ = 128
+
+    def __init__(self, app, url, executor=None):
+        super().__init__(app.asgi, url, executor)
+        app.asgi = self
+
+
+class AsgiClient(UnRestClient):
+    __framework__ = ChainedAsgiFramework
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.get_app()
+        super().setUp()
+
+    def get_app(self):
+        self.app = FakeApp(self.session)
+        return self.app
+
+    async def request(self, url, method, headers, body):
+        url = urlsplit(url)
+        scope = {
+            'type': 'http',
+            'asgi': {'version': '3.0'},
+            'http_version': '1.1',
+            'method': method.upper(),
+            'scheme': 'http',
+            'path': url.path,
+            'raw_path': url.path.encode('latin-1'),
+            'query_string': url.query.encode('latin-1'),
+            'root_path': '',
+            'headers': [
+                (name.lower().encode('latin-1'), str(value).encode('latin-1'))
+                for name, value in headers.items()
+            ],
+        }
+        # Send the body in small chunks to test its incremental reading
+        body = (body or '').encode('utf-8')
+        messages = [
+            {
+                'type': 'http.request',
+                'body': body[start:end],
+                'more_body': end < len(body),
+            }
+            for start, end in (
+                (start, start + 10) for start in range(0, len(body) or 1, 10)
+            )
+        ]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message)
+
+        await self.app.asgi(scope, receive, send)
+        self.session.remove()
+
+        start, *chunks = sent
+        assert all(chunk['type'] == 'http.response.body' for chunk in chunks)
+        assert not chunks[-1].get('more_body', False)
+        return FakeResponse(
+            start['status'],
+            {
+                name.decode('latin-1').title(): value.decode('latin-1')
+                for name, value in start['headers']
+            },
+            b''.join(chunk['body'] for chunk in chunks),
+        )
+
+    def raw_fetch(self, url, method='GET', headers={}, body=None):
+        return self.loop.run_until_complete(
+            self.request(url, method, headers, body)
+        )
+
+    def tearDown(self):
+        self.loop.close()
+        super().tearDown()
@@ -4,6 +4,7 @@ import re
 from sqlalchemy import event
 from sqlalchemy.engine import create_engine
 from sqlalchemy.orm import scoped_session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from ..model import Base, fill_data
 
@@ -33,7 +34,12 @@ class UnRestClient(object):
     def db(cls):
         cls.db_url = 'sqlite://'
 
-        cls.engine = create_engine(cls.db_url)
+        # Routes may run in executor threads: share the memory database
+        cls.engine = create_engine(
+            cls.db_url,
+            connect_args={'check_same_thread': False},
+            poolclass=StaticPool,
+        )
         implement_sqlite_regexp(cls.engine)
         Session = sessionmaker()
         Session.configure(bind=cls.engine)
@@ -0,0 +1,83 @@
+from io import BytesIO
+from urllib.parse import urlsplit
+from wsgiref.util import setup_testing_defaults
+from wsgiref.validate import validator
+
+from ...framework.wsgi import WsgiFramework
+from .http_server import FakeResponse
+from .unrest_client import UnRestClient
+
+
+class FakeApp(object):
+    """
+    The client app: the unrest frameworks created on it are chained, each
+    one falling back on the previous one and the first on `home`.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.wsgi = self.home
+
+    def home(self, environ, start_response):
+        if environ['PATH_INFO'] != '/':
+            start_response('404 Not Found', [('Content-Type', 'text/plain')])
+            return [b'']
+        start_response('200 OK', [('Content-Type', 'text/plain')])
+        return [b'A normal route!']
+
+
+class ChainedWsgiFramework(WsgiFramework):
+    __chunk_size__ = 128
+
+    def __init__(self, app, url):
+        super().__init__(app.wsgi, url)
+        app.wsgi = self
+
+
+class WsgiClient(UnRestClient):
+    __framework__ = ChainedWsgiFramework
+
+    def setUp(self):
+        self.get_app()
+        super().setUp()
+
+    def get_app(self):
+        self.app = FakeApp(self.session)
+        return self.app
+
+    def raw_fetch(self, url, method='GET', headers={}, body=None):
+        url = urlsplit(url)
+        body = (body or '').encode('utf-8')
+        environ = {
+            'REQUEST_METHOD': method.upper(),
+            'SCRIPT_NAME': '',
+            'PATH_INFO': url.path,
+            'QUERY_STRING': url.query,
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': BytesIO(body),
+        }
+        for name, value in headers.items():
+            key = name.upper().replace('-', '_')
+            if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                key = f'HTTP_{key}'
+            environ[key] = str(value)
+        setup_testing_defaults(environ)
+
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started.update(status=status, headers=headers)
+
+        # Check the PEP 3333 compliance of the whole chain
+        iterable = validator(self.app.wsgi)(environ, start_response)
+        try:
+            chunks = list(iterable)
+        finally:
+            iterable.close()
+            self.session.remove()
+
+        return FakeResponse(
+            int(started['status'].split(' ', 1)[0]),
+            dict(started['headers']),
+            b''.join(chunks),
+        )
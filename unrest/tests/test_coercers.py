@@ -61,6 +61,51 @@ def test_serialize():
     }
 
 
+def test_compiled_serialize():
+    class HexSerialize(Serialize):
+        def serialize_largebinary(self, type, data):
+            return data.hex()
+
+    columns = {
+        'str': Item.str,
+        'date': Item.date,
+        'data': Item.data,
+        'boolean': Item.boolean,
+        'array': Item.array,
+    }
+    serialize = HexSerialize.compile(columns, [], {})
+    assert serialize(
+        Item(
+            str='str',
+            date=date(2020, 12, 21),
+            data=b'BIG DATA',
+            array=[timedelta(days=4), None],
+        )
+    ) == {
+        'str': 'str',
+        'date': '2020-12-21',
+        'data': '4249472044415441',
+        'boolean': None,
+        'array': [345_600.0, None],
+    }
+    assert serialize(Item(str='other', data=b'')) == {
+        'str': 'other',
+        'date': None,
+        'data': '',
+        'boolean': None,
+        'array': None,
+    }
+
+
+def test_compiled_serialize_reads_model():
+    class ModelSerialize(Serialize):
+        def serialize_string(self, type, data):
+            return f'{data}-{self.model.__class__.__name__}'
+
+    serialize = ModelSerialize.compile({'str': Item.str}, [], {})
+    assert serialize(Item(str='pine')) == {'str': 'pine-Item'}
+
+
 def test_deserialize():
     item = Item()
     deserialize = Deserialize(
@@ -0,0 +1,85 @@
+from pytest import mark, raises
+
+from .. import UnRest
+from ..framework.router import Router
+from .helpers.asgi import AsgiClient
+from .helpers.http_server import HTTPServerClient
+from .helpers.wsgi import WsgiClient
+from .model import Tree
+
+
+def test_router_match():
+    router = Router()
+    router.add('/api/tree', 'GET', 'get_tree', ['id'])
+    router.add('/api/tree', 'POST', 'post_tree', ['id'])
+    router.add('/api/fruit', 'GET', 'get_fruit', ['fruit_id', 'color'])
+    router.add('/api/', 'GET', 'index')
+
+    assert router.match('/api/tree') == (
+        {'GET': 'get_tree', 'POST': 'post_tree'},
+        {},
+    )
+    assert router.match('/api/tree/2') == (
+        {'GET': 'get_tree', 'POST': 'post_tree'},
+        {'id': '2'},
+    )
+    assert router.match('/api/fruit/1/red') == (
+        {'GET': 'get_fruit'},
+        {'fruit_id': '1', 'color': 'red'},
+    )
+    assert router.match('/api/') == ({'GET': 'index'}, {})
+    assert router.match('/api/fruit/1') is None
+    assert router.match('/api/tree/') is None
+    assert router.match('/api/tree/2/3') is None
+    assert router.match('/api/pine') is None
+    assert router.match('/') is None
+
+
+def test_router_duplicate():
+    router = Router()
+    router.add('/api/tree', 'GET', 'get_tree', ['id'])
+    with raises(KeyError):
+        router.add('/api/tree', 'GET', 'get_tree', ['id'])
+
+
+@mark.parametrize(
+    'client_class', [AsgiClient, HTTPServerClient, WsgiClient]
+)
+def test_method_not_allowed(client_class):
+    client = client_class()
+    client.setUpClass()
+    client.setUp()
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Tree, methods=['GET', 'PUT'])
+
+    response = client.raw_fetch('/api/tree/1', method='DELETE')
+    assert response.code == 405
+    assert response.headers['Allow'] == 'GET, OPTIONS, PUT'
+
+    response = client.raw_fetch('/api/pine')
+    assert response.code == 404
+
+    # Primary keys are single path segments
+    response = client.raw_fetch('/api/tree/1/2')
+    assert response.code == 404
+    client.tearDown()
+
+
+def test_http_server_handler_methods():
+    client = HTTPServerClient()
+    client.setUpClass()
+    client.setUp()
+    rest = UnRest(client.app, client.session, framework=client.__framework__)
+    rest(Tree, methods=['GET', 'PUT'])
+
+    Handler = client.app.RequestHandlerClass
+    assert '__getattribute__' not in vars(Handler)
+    assert {'do_GET', 'do_PUT', 'do_DELETE', 'do_OPTIONS'} <= set(
+        vars(Handler)
+    )
+
+    # Other paths are handled by the app handler
+    assert client.fetch('/') == (200, 'A normal route!')
+    assert client.raw_fetch('/', method='DELETE').code == 501
+    assert client.raw_fetch('/api/tree/1', method='DELETE').code == 405
+    client.tearDown()
@@ -1,15 +1,27 @@
 import json
 import logging
+from contextlib import asynccontextmanager, contextmanager
+
+from sqlalchemy.orm import scoped_session
 
 from .__about__ import __uri__, __version__
 from .coercers import Property
+from .framework import AsyncFramework
 from .generators.openapi import OpenApi
 from .generators.options import Options
 from .rest import Rest
-from .util import Response
+from .util import ContextLocals, Response
+
+try:
+    from sqlalchemy.ext.asyncio import AsyncSession, async_scoped_session
+except ImportError:  # SQLAlchemy < 1.4
+    AsyncSession = async_scoped_session = None
 
 log = logging.getLogger(__name__)
 
+# The request sessions of every UnRest
+_request_sessions = ContextLocals('unrest_sessions')
+
 
 class UnRest(object):
     """
@@ -45,11 +57,39 @@ class UnRest(object):
         serve_openapi_file: Set it to False to disable openapi file generation.
         empty_get_as_404: If True return a 404 on get with id not found.
         info: Additional info for the openapi metadata.
+        session_factory: A function returning a new session for each request,
+            closed at the end of the request. #session is then the current
+            request session.
+        close_session: Set it to True to close (or remove if it's a
+            `scoped_session`) the session at the end of each request.
+            Defaults to True for a `scoped_session` with an
+            #::unrest.framework#AsyncFramework, whose routes run in executor
+            threads, False otherwise.
+        expunge: Set it to True to expunge all the session objects at the end
+            of each request.
+
+    # Sessions
+    By default the given session is used as is: it is committed after write
+    methods and left open. With `session_factory` or `close_session`, each
+    request ends with a rollback of what was not committed (GET are never
+    committed) and the session is closed, releasing its connection and its
+    identity map.
+
+    With an #::unrest.framework#AsyncFramework, synchronous routes run in
+    executor threads where the framework request teardown can't reach a
+    thread local `scoped_session`: it is closed (removed) at the end of
+    each request in its thread unless `close_session` is set to False.
+    Routes sharing a plain session (without `session_factory`) are run one
+    at a time in a single thread.
+
+    The session can also be an `AsyncSession` (or an `async_scoped_session`)
+    with SQLAlchemy >= 1.4, routes are then coroutines.
 
     # Frameworks
     Unrest aims to be framework agnostic.
     It currently works with Flask out of the box and provides some other
-    frameworks: Tornado and python http.server.
+    frameworks: Tornado, Sanic, aiohttp, ASGI, WSGI and python
+    http.server.
     See #::unrest.framework#Framework.
     """
 
@@ -90,6 +130,9 @@ class UnRest(object):
         OptionsClass=Options,
         empty_get_as_404=False,
         info={},
+        session_factory=None,
+        close_session=None,
+        expunge=False,
     ):
         self.rests = []
         self.path = path
@@ -106,6 +149,10 @@ class UnRest(object):
         self.OpenApi = OpenApiClass
         self.Options = OptionsClass
         self.empty_get_as_404 = empty_get_as_404
+        self.session_factory = session_factory
+        self.close_session = close_session
+        self.expunge = expunge
+        self._session = None
         if app is not None:
             self.init_app(app)
         if session is not None:
@@ -140,7 +187,102 @@ class UnRest(object):
         Sets the sqlalchemy session on UnRest
         if it was missing during instantiation.
         """
-        self.session = session
+        self._session = session
+
+    @property
+    def session(self):
+        """
+        The current request session if created by `session_factory`,
+        the UnRest session otherwise.
+        """
+        return _request_sessions.get(self) or self._session
+
+    @session.setter
+    def session(self, session):
+        self.init_session(session)
+
+    @property
+    def has_thread_sessions(self):
+        """
+        True if concurrent requests get their own session: from the
+        `session_factory` or a `scoped_session`.
+        """
+        return self.session_factory is not None or isinstance(
+            self._session, scoped_session
+        )
+
+    @property
+    def is_async(self):
+        """True if the session is an `AsyncSession`."""
+        if AsyncSession is None:
+            return False
+        if self._session is None:
+            factory = getattr(self.session_factory, 'class_', None)
+            return isinstance(factory, type) and issubclass(
+                factory, AsyncSession
+            )
+        return isinstance(self._session, (AsyncSession, async_scoped_session))
+
+    @asynccontextmanager
+    async def async_request_session(self):
+        """
+        The #request_session lifecycle for `AsyncSession`. The #session is
+        the synchronous session of the `AsyncSession` within it.
+        """
+        scoped = None
+        if self.session_factory is not None:
+            session = self.session_factory()
+        else:
+            session = self._session
+        if isinstance(session, async_scoped_session):
+            scoped, session = session, session()
+        token = _request_sessions.set(self, session.sync_session)
+        try:
+            yield session
+        finally:
+            _request_sessions.reset(token)
+            try:
+                if self.session_factory is not None or self.close_session:
+                    await session.rollback()
+                if self.expunge:
+                    session.expunge_all()
+            finally:
+                if self.session_factory is not None:
+                    await session.close()
+                elif self.close_session:
+                    await (scoped.remove() if scoped else session.close())
+
+    @contextmanager
+    def request_session(self):
+        """
+        Context manager handling the session lifecycle of a request according
+        to the `session_factory`, `close_session` and `expunge` options.
+        """
+        token = None
+        if self.session_factory is not None:
+            token = _request_sessions.set(self, self.session_factory())
+        session = self.session
+        close_session = self.close_session
+        if close_session is None:
+            # The route runs in an executor thread
+            close_session = isinstance(
+                self.framework, AsyncFramework
+            ) and isinstance(self._session, scoped_session)
+        try:
+            yield session
+        finally:
+            try:
+                if token is not None or close_session:
+                    # Never keep what was not committed (or GET queries)
+                    session.rollback()
+                if self.expunge:
+                    session.expunge_all()
+            finally:
+                if token is not None:
+                    session.close()
+                    _request_sessions.reset(token)
+                elif close_session:
+                    getattr(session, 'remove', session.close)()
 
     @property
     def root_path(self):
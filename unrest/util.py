@@ -1,3 +1,16 @@
+from contextvars import ContextVar
+from inspect import isawaitable
+from time import perf_counter
+from types import MappingProxyType
+
+from sqlalchemy.sql.elements import ClauseElement
+
+try:
+    from sqlalchemy.util import await_only, greenlet_spawn
+except ImportError:  # SQLAlchemy < 1.4
+    await_only = greenlet_spawn = None
+
+
 class Request(object):
     """
     The unrest request object created in the #::unrest.framework route wrapper.
@@ -34,3 +47,85 @@ class Response(object):
         self.payload = payload
         self.headers = headers
         self.status = status
+
+
+class RequestScope(object):
+    """
+    The state of a #::unrest.rest#Rest endpoint for the request being
+    handled, local to the current thread or asyncio task.
+
+    # Arguments
+        request: The current #::unrest.util#Request.
+        query_alterer: The function altering the endpoint query
+            for this request.
+        payload: The deserialized request payload if any.
+    """
+
+    def __init__(self, request, query_alterer, payload=None):
+        self.request = request
+        self.query_alterer = query_alterer
+        self.payload = payload
+        # Set when the response is minimal whatever the `return` preference
+        self.minimal = False
+        self.start = perf_counter()
+
+    @property
+    def duration(self):
+        """The time elapsed since the beginning of the request in seconds."""
+        return perf_counter() - self.start
+
+
+class ContextLocals(object):
+    """
+    Values local to the current thread or asyncio task, by owner.
+
+    The values of all the owners are held in a single context variable:
+    contexts keep a reference to every variable set in them, so one
+    variable per owner would never be released.
+
+    # Arguments
+        name: The name of the context variable.
+    """
+
+    def __init__(self, name):
+        self._variable = ContextVar(name, default=MappingProxyType({}))
+
+    def get(self, owner):
+        """Returns the current value of `owner` or None."""
+        return self._variable.get().get(owner)
+
+    def set(self, owner, value):
+        """
+        Sets the current value of `owner`.
+
+        # Returns
+        A token to give to #reset.
+        """
+        return self._variable.set(
+            MappingProxyType({**self._variable.get(), owner: value})
+        )
+
+    def reset(self, token):
+        """Restores the values as they were before the #set of `token`."""
+        self._variable.reset(token)
+
+
+def is_sql_expression(attribute):
+    """
+    Returns True if the model `attribute` can be used in SQL: a mapped
+    attribute or a SQL expression, unlike python properties.
+    """
+    return isinstance(attribute, ClauseElement) or hasattr(
+        attribute, '__clause_element__'
+    )
+
+
+def resolve(value):
+    """
+    Returns `value`, awaited if it's awaitable. Awaitables can only be
+    resolved in a route running on an `AsyncSession`, where they are awaited
+    from the route greenlet.
+    """
+    if isawaitable(value):
+        return await_only(value)
+    return value